@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import struct
+import numpy as np
+
+# binary cache layout:
+#   magic | header length (uint32) | json header | padding | raw array data
+# every array starts on a 64 byte boundary so it can be memory mapped directly
+CACHE_MAGIC = b"SHCACHE1"
+CACHE_ALIGNMENT = 64
+
+
+def cache_path(source_path, suffix):
+    return source_path + suffix
+
+
+# cheap key, changes whenever the source file is touched
+def mtime_key(source_path):
+    stat = os.stat(source_path)
+    return "%d:%d" % (stat.st_mtime_ns, stat.st_size)
+
+
+# content key, survives checkouts and copies that reset the mtime
+def content_key(source_path):
+    digest = hashlib.sha1()
+    with open(source_path, "rb") as fp:
+        for block in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _align(offset):
+    return (offset + CACHE_ALIGNMENT - 1) // CACHE_ALIGNMENT * CACHE_ALIGNMENT
+
+
+def write_cache(path, key, arrays):
+    entries = []
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        entries.append(
+            {
+                "name": name,
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+                "offset": offset,
+            }
+        )
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps({"key": key, "arrays": entries}).encode("utf-8")
+    data_start = _align(len(CACHE_MAGIC) + 4 + len(header))
+
+    # write to a temporary file first so a crash never leaves a torn cache
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "wb") as fp:
+            fp.write(CACHE_MAGIC)
+            fp.write(struct.pack("<I", len(header)))
+            fp.write(header)
+            for entry, array in zip(entries, arrays.values()):
+                fp.seek(data_start + entry["offset"])
+                fp.write(np.ascontiguousarray(array).tobytes())
+        os.replace(temp_path, path)
+    except OSError:
+        # the cache is only an optimisation, read only installs still work
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+    return True
+
+
+# returns a dict of memory mapped arrays, or None if the cache is missing or stale
+def read_cache(path, key):
+    try:
+        with open(path, "rb") as fp:
+            if fp.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+                return None
+            (header_length,) = struct.unpack("<I", fp.read(4))
+            header = json.loads(fp.read(header_length).decode("utf-8"))
+    except (OSError, ValueError, struct.error):
+        return None
+
+    if header.get("key") != key:
+        return None
+
+    data_start = _align(len(CACHE_MAGIC) + 4 + header_length)
+    arrays = {}
+    for entry in header["arrays"]:
+        shape = tuple(entry["shape"])
+        if 0 in shape:
+            arrays[entry["name"]] = np.zeros(shape, dtype=entry["dtype"])
+            continue
+        arrays[entry["name"]] = np.memmap(
+            path,
+            dtype=entry["dtype"],
+            mode="r",
+            offset=data_start + entry["offset"],
+            shape=shape,
+        )
+    return arrays
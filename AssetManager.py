@@ -0,0 +1,69 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# decodes and parses assets on worker threads while the main thread brings up
+# the window. only the gl uploads, which need the context, are left for the
+# main thread: `request` starts the cpu side work, `upload` waits for it and
+# hands the result to a gl function
+class AssetManager:
+    def __init__(self, workers=2):
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="assets"
+        )
+        self.pending = {}
+        self.decode_times = {}  # seconds each asset spent on a worker
+        self.wait_time = 0.0  # seconds the main thread blocked on workers
+        self.upload_time = 0.0
+
+    def request(self, name, decode, *args):
+        self.pending[name] = self.executor.submit(self.timed, name, decode, *args)
+
+    def timed(self, name, decode, *args):
+        start = time.perf_counter()
+        result = decode(*args)
+        self.decode_times[name] = time.perf_counter() - start
+        return result
+
+    # blocks until the asset is decoded, re-raising any error from the worker
+    def result(self, name):
+        start = time.perf_counter()
+        result = self.pending.pop(name).result()
+        self.wait_time += time.perf_counter() - start
+        return result
+
+    def upload(self, name, upload):
+        data = self.result(name)
+        start = time.perf_counter()
+        uploaded = upload(data)
+        self.upload_time += time.perf_counter() - start
+        return uploaded
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+# wall clock phases of the startup, in the order they finished
+class StartupTimer:
+    def __init__(self, start=None):
+        self.start = self.last_mark = time.perf_counter() if start is None else start
+        self.phases = []
+
+    # charges the time since the previous mark to `phase`
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last_mark))
+        self.last_mark = now
+
+    def report(self, assets=None):
+        lines = [
+            f"{phase:<16}{seconds * 1000:9.1f} ms" for phase, seconds in self.phases
+        ]
+        lines.append(f"{'total':<16}{(self.last_mark - self.start) * 1000:9.1f} ms")
+        if assets is not None:
+            lines.append("asset decode on worker threads:")
+            for name, seconds in assets.decode_times.items():
+                lines.append(f"  {name:<14}{seconds * 1000:9.1f} ms")
+            lines.append(f"  {'main waited':<14}{assets.wait_time * 1000:9.1f} ms")
+            lines.append(f"  {'gl uploads':<14}{assets.upload_time * 1000:9.1f} ms")
+        return "\n".join(lines)
@@ -0,0 +1,179 @@
+import os
+
+# keep every worker process from printing the pygame banner
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import statistics
+import time
+from Input import AimBotInput
+from Simulation import Simulation, run_headless
+
+
+# one headless game with an aim bot, run inside a worker process
+def run_session(config):
+    simulation = Simulation(
+        num_targets=config["targets"],
+        seed=config["seed"],
+        tick_rate=config["tick_rate"],
+        amplitude_range=config["amplitude_range"],
+        frequency_range=config["frequency_range"],
+    )
+    bot = AimBotInput(aim_jitter=config["aim_jitter"], seed=config["seed"])
+    report = run_headless(simulation, bot, config["max_ticks"])
+
+    cleared = simulation.finished()
+    shots = report["shots_fired"]
+    return {
+        **config,
+        "cleared": cleared,
+        "time_to_clear": report["sim_time"] if cleared else None,
+        "ticks": report["ticks"],
+        "shots_fired": shots,
+        "hits": report["hits"],
+        "hit_ratio": report["hits"] / shots if shots else 0.0,
+        "ticks_per_second": report["ticks_per_second"],
+    }
+
+
+def parse_range(text):
+    low, high = (float(value) for value in text.split(":"))
+    return (low, high)
+
+
+# every combination of the requested ranges, `sessions` seeds each
+def build_configs(args):
+    configs = []
+    seed = args.seed
+    for amplitude_range, frequency_range in itertools.product(
+        args.amplitude, args.frequency
+    ):
+        for _ in range(args.sessions):
+            configs.append(
+                {
+                    "seed": seed,
+                    "targets": args.targets,
+                    "tick_rate": args.tick_rate,
+                    "max_ticks": args.max_ticks,
+                    "amplitude_range": amplitude_range,
+                    "frequency_range": frequency_range,
+                    "aim_jitter": args.aim_jitter,
+                }
+            )
+            seed += 1
+    return configs
+
+
+def mean_or_none(values):
+    return statistics.fmean(values) if values else None
+
+
+# totals per amplitude / frequency combination
+def aggregate(results, wall_time):
+    groups = {}
+    for result in results:
+        key = (tuple(result["amplitude_range"]), tuple(result["frequency_range"]))
+        groups.setdefault(key, []).append(result)
+
+    summary = []
+    for (amplitude_range, frequency_range), group in sorted(groups.items()):
+        clear_times = [r["time_to_clear"] for r in group if r["cleared"]]
+        summary.append(
+            {
+                "amplitude_range": amplitude_range,
+                "frequency_range": frequency_range,
+                "sessions": len(group),
+                "cleared": len(clear_times),
+                "mean_time_to_clear": mean_or_none(clear_times),
+                "median_time_to_clear": (
+                    statistics.median(clear_times) if clear_times else None
+                ),
+                "shots_fired": sum(r["shots_fired"] for r in group),
+                "mean_hit_ratio": mean_or_none([r["hit_ratio"] for r in group]),
+                "mean_ticks_per_second": mean_or_none(
+                    [r["ticks_per_second"] for r in group]
+                ),
+            }
+        )
+
+    total_ticks = sum(r["ticks"] for r in results)
+    return {
+        "sessions": len(results),
+        "wall_time": wall_time,
+        "total_ticks": total_ticks,
+        "aggregate_ticks_per_second": total_ticks / wall_time if wall_time else 0.0,
+        "groups": summary,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="run many headless aim bot sessions across all cpu cores"
+    )
+    parser.add_argument(
+        "--sessions", type=int, default=16, help="sessions per combination"
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first session")
+    parser.add_argument("--targets", type=int, default=10)
+    parser.add_argument("--tick-rate", type=int, default=60)
+    parser.add_argument("--max-ticks", type=int, default=60 * 300)
+    parser.add_argument(
+        "--amplitude",
+        type=parse_range,
+        nargs="+",
+        default=[(3.0, 10.0)],
+        metavar="LOW:HIGH",
+    )
+    parser.add_argument(
+        "--frequency",
+        type=parse_range,
+        nargs="+",
+        default=[(0.5, 2.0)],
+        metavar="LOW:HIGH",
+    )
+    parser.add_argument("--aim-jitter", type=float, default=0.5, help="degrees")
+    parser.add_argument("--output", help="write every session result as json lines")
+    parser.add_argument("--summary", help="write the aggregated results as json")
+    args = parser.parse_args()
+
+    configs = build_configs(args)
+    results = []
+    output = open(args.output, "w") if args.output else None
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.workers) as pool:
+        # results stream back as soon as each session finishes
+        for result in pool.imap_unordered(run_session, configs):
+            results.append(result)
+            if output is not None:
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+            time_to_clear = result["time_to_clear"]
+            print(
+                f"[{len(results)}/{len(configs)}] seed {result['seed']}: "
+                + (
+                    f"cleared in {time_to_clear:.1f}s"
+                    if result["cleared"]
+                    else "not cleared"
+                )
+                + f", {result['shots_fired']} shots, hit ratio {result['hit_ratio']:.2f}, "
+                f"{result['ticks_per_second']:.0f} ticks/s"
+            )
+    wall_time = time.perf_counter() - start
+
+    if output is not None:
+        output.close()
+
+    summary = aggregate(results, wall_time)
+    print(json.dumps(summary, indent=2))
+    if args.summary:
+        with open(args.summary, "w") as fp:
+            json.dump(summary, fp, indent=2)
+
+
+if __name__ == "__main__":
+    main()
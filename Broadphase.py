@@ -0,0 +1,136 @@
+import math
+import numpy as np
+
+
+# uniform grid over the x/z plane. every live target is stored in the cell that
+# contains its hitbox center, so as long as the cell size is at least the
+# largest hitbox half extent a box only ever overlaps its own cell and the
+# ring of cells around it. targets outside the grid are clamped into the
+# border cells, so the grid should cover the whole area targets move in.
+class UniformGrid:
+    def __init__(self, min_x, max_x, min_z, max_z, cell_size=4.0):
+        self.min_x = min_x
+        self.min_z = min_z
+        self.cell_size = cell_size
+        self.columns = max(1, int(math.ceil((max_x - min_x) / cell_size)))
+        self.rows = max(1, int(math.ceil((max_z - min_z) / cell_size)))
+        self.max_x = min_x + self.columns * cell_size
+        self.max_z = min_z + self.rows * cell_size
+
+        # target indices per cell and the cell each target is currently in
+        self.cells = [set() for _ in range(self.columns * self.rows)]
+        self.cell_of = np.full(0, -1, dtype=np.int64)
+
+    def cell_coordinates(self, x, z):
+        column = np.floor((np.asarray(x) - self.min_x) / self.cell_size).astype(
+            np.int64
+        )
+        row = np.floor((np.asarray(z) - self.min_z) / self.cell_size).astype(np.int64)
+        return np.clip(column, 0, self.columns - 1), np.clip(row, 0, self.rows - 1)
+
+    def cell_index(self, x, z):
+        column, row = self.cell_coordinates(x, z)
+        return row * self.columns + column
+
+    # moves only the targets whose cell changed since the last update and
+    # drops targets that died
+    def update(self, targets):
+        if len(self.cell_of) < len(targets):
+            grown = np.full(len(targets), -1, dtype=np.int64)
+            grown[: len(self.cell_of)] = self.cell_of
+            self.cell_of = grown
+
+        new_cells = np.where(
+            targets.alive,
+            self.cell_index(
+                targets.hitbox_position[:, 0], targets.hitbox_position[:, 2]
+            ),
+            -1,
+        )
+        changed = np.flatnonzero(new_cells != self.cell_of)
+        for index in changed:
+            old_cell = self.cell_of[index]
+            new_cell = new_cells[index]
+            if old_cell >= 0:
+                self.cells[old_cell].discard(index)
+            if new_cell >= 0:
+                self.cells[new_cell].add(index)
+            self.cell_of[index] = new_cell
+
+    # walks the segment through the grid (2d dda) and returns the cells it
+    # passes through
+    def traverse(self, start, end):
+        x0, z0 = start[0], start[2]
+        x1, z1 = end[0], end[2]
+        dx = x1 - x0
+        dz = z1 - z0
+
+        # clip the segment to the grid so the walk starts on a valid cell
+        t_enter, t_exit = 0.0, 1.0
+        for origin, delta, low, high in (
+            (x0, dx, self.min_x, self.max_x),
+            (z0, dz, self.min_z, self.max_z),
+        ):
+            if abs(delta) < 1e-12:
+                if origin < low or origin > high:
+                    return []
+                continue
+            t1 = (low - origin) / delta
+            t2 = (high - origin) / delta
+            t_enter = max(t_enter, min(t1, t2))
+            t_exit = min(t_exit, max(t1, t2))
+            if t_enter > t_exit:
+                return []
+
+        x = x0 + dx * t_enter
+        z = z0 + dz * t_enter
+        column, row = (int(value) for value in self.cell_coordinates(x, z))
+        end_column, end_row = (
+            int(value)
+            for value in self.cell_coordinates(x0 + dx * t_exit, z0 + dz * t_exit)
+        )
+
+        step_column = 1 if dx > 0 else -1
+        step_row = 1 if dz > 0 else -1
+
+        # parametric distance to the next cell boundary on each axis
+        if abs(dx) > 1e-12:
+            boundary = self.min_x + (column + (step_column > 0)) * self.cell_size
+            t_max_x = (boundary - x0) / dx
+            t_delta_x = self.cell_size / abs(dx)
+        else:
+            t_max_x = t_delta_x = math.inf
+        if abs(dz) > 1e-12:
+            boundary = self.min_z + (row + (step_row > 0)) * self.cell_size
+            t_max_z = (boundary - z0) / dz
+            t_delta_z = self.cell_size / abs(dz)
+        else:
+            t_max_z = t_delta_z = math.inf
+
+        visited = [(column, row)]
+        max_steps = self.columns + self.rows
+        while (column, row) != (end_column, end_row) and len(visited) <= max_steps:
+            if t_max_x < t_max_z:
+                column += step_column
+                t_max_x += t_delta_x
+            else:
+                row += step_row
+                t_max_z += t_delta_z
+            if not (0 <= column < self.columns and 0 <= row < self.rows):
+                break
+            visited.append((column, row))
+        return visited
+
+    # target indices that could touch the segment, i.e. everything stored in
+    # the visited cells and their neighbours
+    def query_segment(self, start, end):
+        cells = set()
+        for column, row in self.traverse(start, end):
+            for c in range(max(column - 1, 0), min(column + 2, self.columns)):
+                for r in range(max(row - 1, 0), min(row + 2, self.rows)):
+                    cells.add(r * self.columns + c)
+
+        candidates = []
+        for cell in cells:
+            candidates.extend(self.cells[cell])
+        return np.array(candidates, dtype=np.int64)
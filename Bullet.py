@@ -1,65 +1,82 @@
 import pygame
-import time
 import numpy as np
-from OpenGL.GL import *
-from OpenGL.GLU import *
 
 
-class BulletTracer:
-    def __init__(self, start_pos, direction):
-        self.position = pygame.math.Vector3(start_pos)
-        self.previous_position = pygame.math.Vector3(start_pos)
-        self.direction = direction.normalize()
-        self.speed = 150.0
-        self.lifetime = 10.0
-        self.start_time = time.time()
-        self.size = 0.05
-
-    def is_alive(self):
-        return (time.time() - self.start_time) < self.lifetime
+# fixed capacity bullet storage, live bullets are packed into the first
+# `count` rows so removal is a swap with the last live row
+class BulletPool:
+    def __init__(self, capacity=1024, speed=150.0, lifetime=10.0, size=0.05):
+        self.capacity = capacity
+        self.speed = speed
+        self.lifetime = lifetime  # seconds of simulation time
+        self.size = size
+        self.position = np.zeros((capacity, 3))
+        self.previous_position = np.zeros((capacity, 3))
+        self.direction = np.zeros((capacity, 3))
+        self.age = np.zeros(capacity)
+        # stable id per shot, slots move around when bullets are removed
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.next_id = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def positions(self):
+        return self.position[: self.count]
+
+    def previous_positions(self):
+        return self.previous_position[: self.count]
+
+    def directions(self):
+        return self.direction[: self.count]
+
+    # positions blended between the last two ticks for smooth rendering
+    def render_positions(self, alpha):
+        previous = self.previous_positions()
+        return previous + (self.positions() - previous) * alpha
+
+    def spawn(self, start_pos, direction):
+        if self.count == self.capacity:
+            # pool is full, the oldest bullet makes room for the new one
+            self.remove([int(np.argmax(self.age[: self.count]))])
+
+        slot = self.count
+        self.position[slot] = start_pos
+        self.previous_position[slot] = start_pos
+        self.direction[slot] = direction
+        self.direction[slot] /= np.linalg.norm(self.direction[slot])
+        self.age[slot] = 0.0
+        self.ids[slot] = self.next_id
+        self.next_id += 1
+        self.count += 1
+        return slot
+
+    def slot_of(self, shot_id):
+        slots = np.flatnonzero(self.ids[: self.count] == shot_id)
+        return int(slots[0]) if len(slots) else -1
 
     def update(self, delta_time):
-        self.previous_position = pygame.math.Vector3(self.position)
-        self.position += self.direction * self.speed * delta_time
-
-    def draw(self):
-        tracer_length = 1.0
-
-        # set yellow and disable lighting
-        glDisable(GL_LIGHTING)
-        glColor3f(1.0, 1.0, 0.0)
-
-        glPushMatrix()
-        # move to bullet start position
-        glTranslatef(*self.position)
-
-        # calculate rotation to align the tracer with the direction
-        default_direction = pygame.math.Vector3(0, 0, -1)
-        rotation_axis = default_direction.cross(self.direction).normalize()
-        rotation_angle = np.degrees(np.arccos(default_direction.dot(self.direction)))
-
-        if rotation_axis.length() > 0:
-            glRotatef(rotation_angle, rotation_axis.x, rotation_axis.y, rotation_axis.z)
-
-        # draw the cylinder
-        quadric = gluNewQuadric()
-        gluCylinder(quadric, self.size / 4, self.size / 4, tracer_length, 16, 16)
-
-        # add caps to make it look like a bullet
-        glPushMatrix()
-        gluSphere(quadric, self.size / 4, 16, 16)
-        glPopMatrix()
-
-        glPushMatrix()
-
-        # move to the end of the bullet and add another cap
-        glTranslatef(0, 0, tracer_length)
-        gluSphere(quadric, self.size / 4, 16, 16)
-        glPopMatrix()
-
-        glPopMatrix()
-
-        glEnable(GL_LIGHTING)
+        live = slice(0, self.count)
+        self.previous_position[live] = self.position[live]
+        self.position[live] += self.direction[live] * (self.speed * delta_time)
+        self.age[live] += delta_time
+
+    def expired(self):
+        return self.age[: self.count] >= self.lifetime
+
+    # removes the given slots by moving the last live bullet into each hole,
+    # highest slot first so a moved bullet is never one still to be removed
+    def remove(self, slots):
+        for slot in sorted(set(int(slot) for slot in slots), reverse=True):
+            last = self.count - 1
+            if slot != last:
+                self.position[slot] = self.position[last]
+                self.previous_position[slot] = self.previous_position[last]
+                self.direction[slot] = self.direction[last]
+                self.age[slot] = self.age[last]
+                self.ids[slot] = self.ids[last]
+            self.count -= 1
 
 
 def line_aabb_intersection(p1, p2, box_min, box_max):
@@ -99,31 +116,131 @@ def line_aabb_intersection(p1, p2, box_min, box_max):
 
 
 def check_hits_continuous(targets, bullet, hitbox_scale):
-    for target in targets:
-        if target["hit"]:
-            continue
-
-        # define hitbox by creating a box around the target's hitbox position
-        half_size = (target["size"] / 2) * hitbox_scale
-        y_half_size = target["size"] / 2
-        box_min = target["hitbox_position"] - pygame.math.Vector3(
-            half_size, y_half_size, half_size
-        )
-        box_max = target["hitbox_position"] + pygame.math.Vector3(
-            half_size, y_half_size, half_size
-        )
+    indices = targets.live_indices()
+    boxes_min, boxes_max = targets.hitbox_bounds(hitbox_scale, indices)
 
+    for index, box_min, box_max in zip(indices, boxes_min, boxes_max):
         # check if the bullet's path intersects the target's bounding box
         if line_aabb_intersection(
             bullet.previous_position, bullet.position, box_min, box_max
         ):
-            target["hit"] = True
-            print(f"Target at {target['position']} hit!")
+            targets.kill(index)
+            print(f"Target at {targets.position[index]} hit!")
             return True
 
     return False
 
 
+# vectorized slab test, works on any broadcastable stack of segments and boxes
+# and returns the entry time along each segment (0..1) or inf for a miss
+def slab_entry_times(starts, ends, boxes_min, boxes_max):
+    direction = ends - starts
+
+    # axes where the segment is parallel to the slab never get divided by
+    parallel = np.abs(direction) < 1e-8
+    ood = 1.0 / np.where(parallel, 1.0, direction)
+    t1 = (boxes_min - starts) * ood
+    t2 = (boxes_max - starts) * ood
+    t_enter = np.minimum(t1, t2)
+    t_exit = np.maximum(t1, t2)
+
+    # a parallel segment either stays inside the slab forever or never enters it
+    inside = (starts >= boxes_min) & (starts <= boxes_max)
+    t_enter = np.where(parallel, np.where(inside, -np.inf, np.inf), t_enter)
+    t_exit = np.where(parallel, np.where(inside, np.inf, -np.inf), t_exit)
+
+    t_min = np.maximum(t_enter.max(axis=-1), 0.0)
+    t_max = np.minimum(t_exit.min(axis=-1), 1.0)
+    return np.where(t_min <= t_max, t_min, np.inf)
+
+
+# every segment against every box, returns a (segments, boxes) table
+def segments_aabb_intersection(starts, ends, boxes_min, boxes_max):
+    return slab_entry_times(
+        starts[:, None, :],
+        ends[:, None, :],
+        boxes_min[None, :, :],
+        boxes_max[None, :, :],
+    )
+
+
+# below this many live targets testing everything is cheaper than the grid walk
+BROADPHASE_MIN_TARGETS = 256
+
+
+# finds the nearest live target along each bullet segment without changing
+# anything. with a broadphase grid only nearby targets are narrowphase
+# tested, otherwise every bullet is tested against every live target, or
+# only against `candidates` when given. returns the hit target index for
+# each bullet, or -1 for bullets that missed
+def find_hits(targets, starts, ends, hitbox_scale, grid=None, candidates=None):
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 3)
+    ends = np.asarray(ends, dtype=np.float64).reshape(-1, 3)
+    hits = np.full(len(starts), -1, dtype=np.int64)
+    if len(starts) == 0 or targets.live_count() == 0:
+        return hits
+
+    if candidates is not None:
+        indices = candidates[targets.alive[candidates]]
+        grid = None
+    else:
+        indices = targets.live_indices()
+    if len(indices) == 0:
+        return hits
+    if grid is None or targets.live_count() < BROADPHASE_MIN_TARGETS:
+        boxes_min, boxes_max = targets.hitbox_bounds(hitbox_scale, indices)
+        t = segments_aabb_intersection(starts, ends, boxes_min, boxes_max)
+        nearest = np.argmin(t, axis=1)
+        hit = np.isfinite(t[np.arange(len(starts)), nearest])
+        hits[hit] = indices[nearest[hit]]
+        return hits
+
+    # gather (bullet, candidate target) pairs from the grid
+    pair_bullets = []
+    pair_targets = []
+    for bullet in range(len(starts)):
+        candidates = grid.query_segment(starts[bullet], ends[bullet])
+        pair_bullets.append(np.full(len(candidates), bullet, dtype=np.int64))
+        pair_targets.append(candidates)
+    pair_bullets = np.concatenate(pair_bullets)
+    pair_targets = np.concatenate(pair_targets)
+
+    live = targets.alive[pair_targets]
+    pair_bullets = pair_bullets[live]
+    pair_targets = pair_targets[live]
+    if len(pair_targets) == 0:
+        return hits
+
+    boxes_min, boxes_max = targets.hitbox_bounds(hitbox_scale, pair_targets)
+    t = slab_entry_times(starts[pair_bullets], ends[pair_bullets], boxes_min, boxes_max)
+
+    # keep the earliest finite t per bullet, ties go to the lowest index
+    found = np.isfinite(t)
+    pair_bullets = pair_bullets[found]
+    pair_targets = pair_targets[found]
+    order = np.lexsort((pair_targets, t[found], pair_bullets))
+    pair_bullets = pair_bullets[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = pair_bullets[1:] != pair_bullets[:-1]
+    hits[pair_bullets[first]] = pair_targets[order][first]
+    return hits
+
+
+# tests every bullet segment against the live targets at once and kills the
+# targets that were hit, each bullet hits the nearest target along its path
+def check_hits_batch(
+    targets, starts, ends, hitbox_scale, grid=None, verbose=True, candidates=None
+):
+    hits = find_hits(targets, starts, ends, hitbox_scale, grid, candidates)
+
+    for index in np.unique(hits[hits >= 0]):
+        targets.kill(index)
+        if verbose:
+            print(f"Target at {targets.position[index]} hit!")
+
+    return hits
+
+
 def shoot_bullet(camera, bullets):
     gun_world_pos = (
         pygame.math.Vector3(camera.eye)
@@ -134,9 +251,7 @@ def shoot_bullet(camera, bullets):
 
     bullet_start_pos = gun_world_pos
 
-    bullet_direction = pygame.math.Vector3(camera.forward).normalize()
-
-    bullet = BulletTracer(bullet_start_pos, bullet_direction)
-    bullets.append(bullet)
+    slot = bullets.spawn(bullet_start_pos, camera.forward)
 
     camera.apply_recoil(5.0)
+    return slot
@@ -0,0 +1,92 @@
+import numpy as np
+from OpenGL.GL import *
+from Geometry import build_capsule
+from Frustum import spheres_visible
+
+# tracers are tiny, so a coarse capsule looks the same as the old 16x16 one
+TRACER_LENGTH = 1.0
+TRACER_SLICES = 6
+TRACER_STACKS = 2
+
+tracer_template = {}
+
+
+# tracer capsule in its own frame, trailing behind the bullet along +z
+def tracer_geometry(size):
+    geometry = tracer_template.get(size)
+    if geometry is None:
+        radius = size / 4
+        vertices, _, indices = build_capsule(
+            radius, TRACER_LENGTH, TRACER_SLICES, TRACER_STACKS
+        )
+        # the capsule is built along y, tracers extend along z
+        vertices = vertices[:, [0, 2, 1]].astype(np.float64)
+        geometry = (vertices, indices, {})
+        tracer_template[size] = geometry
+    return geometry
+
+
+# index buffer for `count` copies of the template, cached per count
+def tracer_indices(size, count):
+    vertices, indices, batches = tracer_geometry(size)
+    batch = batches.get(count)
+    if batch is None:
+        offsets = np.arange(count, dtype=np.uint32)[:, None] * len(vertices)
+        batch = (indices[None, :] + offsets).ravel()
+        batches.clear()
+        batches[count] = batch
+    return batch
+
+
+# bounding sphere of each tracer, which trails TRACER_LENGTH behind the bullet
+def tracer_bounding_spheres(positions, directions, size):
+    centers = positions - directions * (TRACER_LENGTH / 2)
+    radii = np.full(len(positions), TRACER_LENGTH / 2 + size / 4)
+    return centers, radii
+
+
+# writes every tracer into one vertex array and draws them with a single call,
+# skipping tracers outside the view frustum when `planes` is given. returns
+# how many were culled
+def draw_tracers(positions, directions, size=0.05, planes=None):
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    directions = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+    culled = 0
+    if planes is not None and len(positions) > 0:
+        visible = spheres_visible(
+            planes, *tracer_bounding_spheres(positions, directions, size)
+        )
+        culled = len(positions) - int(np.count_nonzero(visible))
+        positions = positions[visible]
+        directions = directions[visible]
+    if len(positions) == 0:
+        return culled
+
+    vertices, _, _ = tracer_geometry(size)
+
+    # build a frame per bullet whose -z axis points along the flight direction
+    backward = -directions
+    reference = np.where(
+        np.abs(directions[:, 1:2]) > 0.99, [[1.0, 0.0, 0.0]], [[0.0, 1.0, 0.0]]
+    )
+    side = np.cross(reference, backward)
+    side /= np.linalg.norm(side, axis=1)[:, None]
+    up = np.cross(backward, side)
+
+    world = (
+        positions[:, None, :]
+        + vertices[None, :, 0, None] * side[:, None, :]
+        + vertices[None, :, 1, None] * up[:, None, :]
+        + vertices[None, :, 2, None] * backward[:, None, :]
+    )
+    world = np.ascontiguousarray(world, dtype=np.float32).reshape(-1, 3)
+    indices = tracer_indices(size, len(positions))
+
+    # yellow, drawn with lighting off
+    glColor3f(1.0, 1.0, 0.0)
+
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glVertexPointer(3, GL_FLOAT, 0, world)
+    glDrawElements(GL_TRIANGLES, len(indices), GL_UNSIGNED_INT, indices)
+    glDisableClientState(GL_VERTEX_ARRAY)
+    return culled
@@ -1,7 +1,9 @@
-from OpenGL.GLU import *
-from OpenGL.GL import *
 from math import cos, sin, radians
 import pygame
+from Input import read_pygame_input
+from Frustum import frustum_planes
+from HeightField import GROUND_HEIGHT, height_at
+from Transform import look_at, perspective, rotation, translation
 
 
 class Camera:
@@ -11,9 +13,13 @@ class Camera:
         ground_max_x,
         ground_min_z,
         ground_max_z,
+        height_field=None,
     ):
         self.gun_mesh = None
         self.eye = pygame.math.Vector3(0, 1.0, 5)
+        # eye at the start of the current tick and the blended eye drawn from
+        self.previous_eye = pygame.math.Vector3(self.eye)
+        self.render_eye = pygame.math.Vector3(self.eye)
         self.up = pygame.math.Vector3(0, 1, 0)
         self.right = pygame.math.Vector3(1, 0, 0)
         self.forward = pygame.math.Vector3(0, 0, -1)
@@ -24,6 +30,16 @@ class Camera:
         self.mouse_sensitivityY = 0.1
         self.key_sensitivity = 5.0
 
+        # view matrix from the render eye, rebuilt only after the camera moved
+        self.view = None
+        self.view_dirty = True
+
+        # projection settings, shared by the projection matrix and culling
+        self.fov = 60.0
+        self.aspect = 4 / 3
+        self.near = 0.1
+        self.far = 500.0
+
         # recoil attributes
         self.gun_recoil = 0.0
         self.max_recoil = 5.0
@@ -35,6 +51,58 @@ class Camera:
         self.ground_min_z = ground_min_z
         self.ground_max_z = ground_max_z
 
+        # terrain the eye walks on at a fixed height, None keeps the eye at
+        # its starting height over the flat ground
+        self.height_field = height_field
+        self.eye_height = self.eye.y - GROUND_HEIGHT
+        self.stand_on_ground()
+
+    def set_projection(self, fov, aspect, near, far):
+        self.fov = fov
+        self.aspect = aspect
+        self.near = near
+        self.far = far
+
+    def projection_matrix(self):
+        return perspective(self.fov, self.aspect, self.near, self.far)
+
+    def view_matrix(self):
+        if self.view_dirty:
+            self.view = look_at(
+                self.render_eye, self.render_eye + self.forward, self.up
+            )
+            self.view_dirty = False
+        return self.view
+
+    # model matrix of the gun, follows the eye and the camera's orientation
+    def gun_matrix(self):
+        return (
+            # position the gun model to match the camera's position
+            translation(self.render_eye.x, self.render_eye.y, self.render_eye.z)
+            # rotate the gun model to match the camera's orientation
+            @ rotation(-self.yaw, 0, 1, 0)
+            @ rotation(self.pitch, 1, 0, 0)
+            # rotate the gun model
+            @ rotation(-90, 0, 1, 0)
+            # apply gun recoil
+            @ rotation(self.gun_recoil, 0, 0, -1)
+            # offset the gun to appear like the player is holding it
+            @ translation(-0.6, -0.2, -0.3)
+        )
+
+    # planes of the view volume seen from the interpolated eye
+    def frustum_planes(self):
+        return frustum_planes(
+            self.render_eye,
+            self.forward,
+            self.right,
+            self.up,
+            self.fov,
+            self.aspect,
+            self.near,
+            self.far,
+        )
+
     # applies the gun recoil
     def apply_recoil(self, recoil_amount):
         self.gun_recoil += recoil_amount
@@ -51,29 +119,8 @@ class Camera:
     def attach_gun(self, gun_mesh):
         self.gun_mesh = gun_mesh
 
-    def draw_gun(self):
-        if self.gun_mesh:
-            glPushMatrix()
-            # position the gun model to match the camera's position
-            glTranslatef(self.eye.x, self.eye.y, self.eye.z)
-
-            # rotate the gun model to match the camera's orientation
-            glRotatef(-self.yaw, 0, 1, 0)
-            glRotatef(self.pitch, 1, 0, 0)
-
-            # rotate the gun model
-            glRotatef(-90, 0, 1, 0)
-
-            # apply gun recoil
-            glRotatef(self.gun_recoil, 0, 0, -1)
-
-            # offset the gun to appear like the player is holding it
-            glTranslatef(-0.6, -0.2, -0.3)
-
-            self.gun_mesh.draw()
-            glPopMatrix()
-
     def rotate(self, yaw, pitch):
+        previous = (self.yaw, self.pitch)
         self.yaw -= yaw
         self.pitch += pitch
 
@@ -82,12 +129,17 @@ class Camera:
         if self.pitch < -89.0:
             self.pitch = -89.0
 
+        # no mouse movement, or pitch held at its limit, keeps the cached view
+        if (self.yaw, self.pitch) == previous:
+            return
+
         self.forward.x = cos(radians(self.pitch)) * sin(radians(self.yaw))
         self.forward.y = sin(radians(self.pitch))
         self.forward.z = -cos(radians(self.pitch)) * cos(radians(self.yaw))
         self.forward = self.forward.normalize()
         self.right = self.forward.cross(pygame.math.Vector3(0, 1, 0)).normalize()
         self.up = self.right.cross(self.forward).normalize()
+        self.view_dirty = True
 
     def move(self, direction, delta_time, current_sensitivity):
         movement = direction * current_sensitivity * delta_time
@@ -96,33 +148,36 @@ class Camera:
         # enforce boundary constraints
         self.eye.x = max(self.ground_min_x, min(self.ground_max_x, proposed_position.x))
         self.eye.z = max(self.ground_min_z, min(self.ground_max_z, proposed_position.z))
+        # the view follows through set_render_eye, only if the eye moved
+        self.stand_on_ground()
 
-    def update(self, w, h, delta_time):
-        if pygame.mouse.get_visible():
-            return
+    def stand_on_ground(self):
+        if self.height_field is not None:
+            ground = height_at(self.height_field, self.eye.x, self.eye.z)
+            self.eye.y = ground + self.eye_height
 
-        mouse_pos = pygame.mouse.get_pos()
-        center_pos = (w / 2, h / 2)
-        mouse_change = pygame.math.Vector2(mouse_pos) - pygame.math.Vector2(center_pos)
-        pygame.mouse.set_pos(center_pos)
+    def update(self, w, h, delta_time):
+        self.apply_input(read_pygame_input(w, h), delta_time)
 
+    # steers the camera from one input frame, no window or gl needed
+    def apply_input(self, frame, delta_time):
+        self.previous_eye = pygame.math.Vector3(self.eye)
         self.rotate(
-            -mouse_change.x * self.mouse_sensitivityX,
-            -mouse_change.y * self.mouse_sensitivityY,
+            -frame.mouse_dx * self.mouse_sensitivityX,
+            -frame.mouse_dy * self.mouse_sensitivityY,
         )
 
-        keys = pygame.key.get_pressed()
-        sprint_multiplier = 2 if keys[pygame.K_LSHIFT] else 1
+        sprint_multiplier = 2 if frame.sprint else 1
         current_sensitivity = self.key_sensitivity * sprint_multiplier
         move_direction = pygame.math.Vector3(0, 0, 0)
 
-        if keys[pygame.K_w]:
+        if frame.forward:
             move_direction += self.forward
-        if keys[pygame.K_s]:
+        if frame.back:
             move_direction -= self.forward
-        if keys[pygame.K_d]:
+        if frame.right:
             move_direction += self.right
-        if keys[pygame.K_a]:
+        if frame.left:
             move_direction -= self.right
 
         # prevent y axis movement
@@ -132,16 +187,13 @@ class Camera:
             self.move(move_direction, delta_time, current_sensitivity)
 
         self.look = self.eye + self.forward
+        self.set_render_eye(pygame.math.Vector3(self.eye))
 
-    def apply(self):
-        gluLookAt(
-            self.eye.x,
-            self.eye.y,
-            self.eye.z,
-            self.look.x,
-            self.look.y,
-            self.look.z,
-            self.up.x,
-            self.up.y,
-            self.up.z,
-        )
+    def set_render_eye(self, eye):
+        if eye != self.render_eye:
+            self.render_eye = eye
+            self.view_dirty = True
+
+    # blends the eye between the last two ticks, alpha 0 is the previous tick
+    def interpolate(self, alpha):
+        self.set_render_eye(self.previous_eye.lerp(self.eye, alpha))
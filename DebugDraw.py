@@ -0,0 +1,97 @@
+import numpy as np
+from OpenGL.GL import *
+
+# the 12 edges of a box as pairs of corner numbers, bit 0 picks x, bit 1
+# picks y and bit 2 picks z from the max corner instead of the min corner
+BOX_CORNER_BITS = np.array([[(c >> axis) & 1 for axis in range(3)] for c in range(8)])
+BOX_EDGES = np.array(
+    [
+        # bottom
+        (0, 1),
+        (1, 5),
+        (5, 4),
+        (4, 0),
+        # top
+        (2, 3),
+        (3, 7),
+        (7, 6),
+        (6, 2),
+        # vertical
+        (0, 2),
+        (1, 3),
+        (5, 7),
+        (4, 6),
+    ]
+).reshape(-1)
+
+
+# collects the debug lines of a frame and draws each layer with one call.
+# the world layer is drawn with the scene's camera and depth test, the
+# screen layer in pixels on top of everything
+class DebugDraw:
+    def __init__(self):
+        self.layers = {"world": [], "screen": []}
+        self.line_width = {"world": 1.0, "screen": 2.0}
+
+    def lines(self, starts, ends, color, layer="world"):
+        starts = np.asarray(starts, dtype=np.float32).reshape(-1, 3)
+        ends = np.asarray(ends, dtype=np.float32).reshape(-1, 3)
+        if len(starts) == 0:
+            return
+        vertices = np.empty((len(starts), 2, 3), dtype=np.float32)
+        vertices[:, 0] = starts
+        vertices[:, 1] = ends
+        colors = np.empty_like(vertices)
+        colors[:] = color
+        self.layers[layer].append((vertices.reshape(-1, 3), colors.reshape(-1, 3)))
+
+    def line(self, start, end, color, layer="world"):
+        self.lines([start], [end], color, layer)
+
+    # wireframe boxes from arrays of min and max corners
+    def boxes(self, boxes_min, boxes_max, color, layer="world"):
+        boxes_min = np.asarray(boxes_min, dtype=np.float32).reshape(-1, 3)
+        boxes_max = np.asarray(boxes_max, dtype=np.float32).reshape(-1, 3)
+        if len(boxes_min) == 0:
+            return
+        corners = np.where(
+            BOX_CORNER_BITS[None, :, :], boxes_max[:, None, :], boxes_min[:, None, :]
+        )
+        vertices = corners[:, BOX_EDGES].reshape(-1, 3)
+        colors = np.empty_like(vertices)
+        colors[:] = color
+        self.layers[layer].append((vertices, colors))
+
+    # 2d lines in screen pixels, drawn with the screen layer
+    def screen_lines(self, starts, ends, color):
+        starts = np.asarray(starts, dtype=np.float32).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=np.float32).reshape(-1, 2)
+        zeros = np.zeros((len(starts), 1), dtype=np.float32)
+        self.lines(
+            np.hstack([starts, zeros]), np.hstack([ends, zeros]), color, "screen"
+        )
+
+    def clear(self):
+        for chunks in self.layers.values():
+            chunks.clear()
+
+    # draws one layer with a single call, the render queue turns lighting off
+    # for both layers and sets up the pixel projection for the screen layer
+    def draw_layer(self, layer):
+        chunks = self.layers[layer]
+        if not chunks:
+            return
+        vertices = np.ascontiguousarray(np.concatenate([c[0] for c in chunks]))
+        colors = np.ascontiguousarray(np.concatenate([c[1] for c in chunks]))
+        chunks.clear()
+
+        glLineWidth(self.line_width[layer])
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, vertices)
+        glColorPointer(3, GL_FLOAT, 0, colors)
+        glDrawArrays(GL_LINES, 0, len(vertices))
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glLineWidth(1)
+        glColor(1, 1, 1)
@@ -0,0 +1,38 @@
+import math
+import numpy as np
+
+
+# the six planes of a perspective view as rows of (nx, ny, nz, d). a point p
+# is inside when n . p + d >= 0 for every plane. fov is the vertical field
+# of view in degrees like gluPerspective
+def frustum_planes(eye, forward, right, up, fov, aspect, near, far):
+    eye = np.asarray(eye, dtype=np.float64)
+    forward = np.asarray(forward, dtype=np.float64)
+    right = np.asarray(right, dtype=np.float64)
+    up = np.asarray(up, dtype=np.float64)
+
+    tan_y = math.tan(math.radians(fov) / 2)
+    tan_x = tan_y * aspect
+    normals = np.array(
+        [
+            forward,  # near
+            -forward,  # far
+            forward * tan_x + right,  # left
+            forward * tan_x - right,  # right
+            forward * tan_y + up,  # bottom
+            forward * tan_y - up,  # top
+        ]
+    )
+    normals /= np.linalg.norm(normals, axis=1)[:, None]
+
+    distances = -normals @ eye
+    distances[0] -= near
+    distances[1] += far
+    return np.hstack([normals, distances[:, None]])
+
+
+# mask of the spheres that are at least partly inside the frustum
+def spheres_visible(planes, centers, radii):
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+    distances = centers @ planes[:, :3].T + planes[:, 3]
+    return np.all(distances >= -np.asarray(radii).reshape(-1, 1), axis=1)
@@ -0,0 +1,84 @@
+import os
+import sys
+from collections import Counter
+
+FAST_GL_FLAG = "--fast-gl"
+FAST_GL_ENV = "SHOOTER_FAST_GL"
+
+
+def fast_gl_requested(argv):
+    return FAST_GL_FLAG in argv or os.environ.get(FAST_GL_ENV) == "1"
+
+
+# production settings for pyopengl: no glGetError after every call, no error
+# logging wrappers and no silent array copies. pyopengl reads these flags once
+# when OpenGL.GL is first imported, so this has to run before that
+def configure_fast_gl():
+    if "OpenGL.GL" in sys.modules:
+        raise RuntimeError("configure_fast_gl must run before OpenGL.GL is imported")
+    import OpenGL
+
+    OpenGL.ERROR_CHECKING = False
+    OpenGL.ERROR_LOGGING = False
+    OpenGL.ERROR_ON_COPY = True
+    OpenGL.CONTEXT_CHECKING = False
+    OpenGL.FULL_LOGGING = False
+
+
+# counts gl and glu calls per frame by calling module and function. every
+# module does `from OpenGL.GL import *`, so the counter swaps the gl names in
+# each module's globals for counting wrappers. only functions that pyopengl
+# exports are wrapped, helpers such as gl_matrix are plain numpy, and null
+# functions are left alone so `bool(glGenBuffers)` checks keep working
+class GLCallCounter:
+    def __init__(self):
+        self.frame = Counter()  # (module, function) -> calls in this frame
+        self.totals = Counter()
+        self.frames = 0
+        self.last_frame_calls = 0
+        self.installed = []
+
+    def install(self, modules):
+        import OpenGL.GL
+        import OpenGL.GLU
+
+        exported = {**vars(OpenGL.GLU), **vars(OpenGL.GL)}
+        for module in modules:
+            for name, value in list(vars(module).items()):
+                if not name.startswith("gl") or exported.get(name) is not value:
+                    continue
+                if not callable(value) or not value:
+                    continue
+                setattr(module, name, self.wrap(module.__name__, value))
+                self.installed.append((module, name, value))
+
+    def uninstall(self):
+        for module, name, value in self.installed:
+            setattr(module, name, value)
+        self.installed.clear()
+
+    def wrap(self, module_name, function):
+        counts = self.frame
+        caller = sys._getframe
+
+        def counted(*args, **kwargs):
+            counts[(module_name, caller(1).f_code.co_name)] += 1
+            return function(*args, **kwargs)
+
+        return counted
+
+    def end_frame(self):
+        self.last_frame_calls = sum(self.frame.values())
+        self.totals.update(self.frame)
+        self.frame.clear()
+        self.frames += 1
+
+    # average calls per frame of the busiest callers
+    def summary(self, top=15):
+        if self.frames == 0:
+            return ""
+        total = sum(self.totals.values()) / self.frames
+        lines = [f"gl calls per frame: {total:.1f}"]
+        for (module, function), calls in self.totals.most_common(top):
+            lines.append(f"  {module + '.' + function:<36}{calls / self.frames:9.1f}")
+        return "\n".join(lines)
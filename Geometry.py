@@ -0,0 +1,68 @@
+import math
+import numpy as np
+
+
+# triangle indices for a grid of (rows + 1) x (columns + 1) vertices
+def grid_indices(rows, columns, offset=0):
+    row = np.arange(rows)[:, None]
+    column = np.arange(columns)[None, :]
+    a = row * (columns + 1) + column + offset
+    b = a + columns + 1
+    quads = np.stack([a, b, a + 1, a + 1, b, b + 1], axis=-1)
+    return quads.reshape(-1).astype(np.uint32)
+
+
+# hemisphere of the given radius on top of y = base, direction is 1 for a
+# dome pointing up and -1 for one pointing down
+def build_hemisphere(radius, slices, stacks, base=0.0, direction=1):
+    latitude = (math.pi / 2) * np.arange(stacks + 1) / stacks
+    longitude = 2 * math.pi * np.arange(slices + 1) / slices
+    lat, lng = np.meshgrid(latitude, longitude, indexing="ij")
+
+    normals = np.stack(
+        [np.cos(lng) * np.cos(lat), direction * np.sin(lat), np.sin(lng) * np.cos(lat)],
+        axis=-1,
+    ).reshape(-1, 3)
+    vertices = normals * radius
+    vertices[:, 1] += base
+    return vertices, normals, grid_indices(stacks, slices)
+
+
+# open cylinder standing on y = 0
+def build_cylinder(radius, height, slices, stacks):
+    heights = height * np.arange(stacks + 1) / stacks
+    longitude = 2 * math.pi * np.arange(slices + 1) / slices
+    y, lng = np.meshgrid(heights, longitude, indexing="ij")
+
+    normals = np.stack([np.cos(lng), np.zeros_like(lng), np.sin(lng)], axis=-1).reshape(
+        -1, 3
+    )
+    vertices = normals * radius
+    vertices[:, 1] = y.reshape(-1)
+    return vertices, normals, grid_indices(stacks, slices)
+
+
+# capsule standing on y = -radius: a cylinder from y = 0 to y = cylinder_height
+# with a hemisphere on each end
+def build_capsule(radius, cylinder_height, slices, stacks):
+    parts = [
+        build_cylinder(radius, cylinder_height, slices, stacks),
+        build_hemisphere(radius, slices, stacks, cylinder_height, 1),
+        build_hemisphere(radius, slices, stacks, 0.0, -1),
+    ]
+
+    vertices = []
+    normals = []
+    indices = []
+    offset = 0
+    for part_vertices, part_normals, part_indices in parts:
+        vertices.append(part_vertices)
+        normals.append(part_normals)
+        indices.append(part_indices + offset)
+        offset += len(part_vertices)
+
+    return (
+        np.concatenate(vertices).astype(np.float32),
+        np.concatenate(normals).astype(np.float32),
+        np.concatenate(indices).astype(np.uint32),
+    )
@@ -0,0 +1,125 @@
+import numpy as np
+import pygame
+
+# height fields for the terrain, plain numpy so the simulation can walk the
+# player over them without a gl context
+
+# height of the original flat ground, the arena in the middle of the map stays
+# at this height so targets and the player are unaffected by the hills
+GROUND_HEIGHT = -1.0
+ARENA_HALF_SIZE = 50.0
+ARENA_BLEND = 30.0
+
+# how far the procedural hills reach from the origin in each direction
+NOISE_HALF_SIZE = 1000.0
+
+
+def smoothstep(edge0, edge1, x):
+    t = np.clip((x - edge0) / (edge1 - edge0), 0.0, 1.0)
+    return t * t * (3 - 2 * t)
+
+
+# flattens the terrain towards the ground height inside the arena
+def flatten_arena(x, z, heights):
+    distance = np.maximum(np.abs(x), np.abs(z))
+    blend = smoothstep(ARENA_HALF_SIZE, ARENA_HALF_SIZE + ARENA_BLEND, distance)
+    return GROUND_HEIGHT + (heights - GROUND_HEIGHT) * blend
+
+
+# random value in [0, 1) for every integer lattice point
+def lattice_values(xi, zi, seed):
+    h = (
+        xi.astype(np.uint64) * np.uint64(374761393)
+        + zi.astype(np.uint64) * np.uint64(668265263)
+        + np.uint64(seed * 144665 % 2**32)
+    ) & np.uint64(0xFFFFFFFF)
+    h = ((h ^ (h >> np.uint64(13))) * np.uint64(1274126177)) & np.uint64(0xFFFFFFFF)
+    h ^= h >> np.uint64(16)
+    return (h & np.uint64(0xFFFFFF)).astype(np.float64) / 0x1000000
+
+
+def value_noise(x, z, seed):
+    xi = np.floor(x)
+    zi = np.floor(z)
+    fx = smoothstep(0.0, 1.0, x - xi)
+    fz = smoothstep(0.0, 1.0, z - zi)
+    xi = xi.astype(np.int64)
+    zi = zi.astype(np.int64)
+    top = (
+        lattice_values(xi, zi, seed) * (1 - fx) + lattice_values(xi + 1, zi, seed) * fx
+    )
+    bottom = (
+        lattice_values(xi, zi + 1, seed) * (1 - fx)
+        + lattice_values(xi + 1, zi + 1, seed) * fx
+    )
+    return top * (1 - fz) + bottom * fz
+
+
+# seeded rolling hills from a few octaves of value noise
+class NoiseHeightField:
+    def __init__(
+        self,
+        seed=0,
+        feature_size=120.0,
+        height=40.0,
+        octaves=4,
+        half_size=NOISE_HALF_SIZE,
+    ):
+        self.seed = seed
+        self.feature_size = feature_size
+        self.height = height
+        self.octaves = octaves
+        self.half_size = half_size  # walkable distance from the origin
+
+    def heights(self, x, z):
+        total = np.zeros(np.broadcast(x, z).shape)
+        amplitude = 1.0
+        frequency = 1.0 / self.feature_size
+        for octave in range(self.octaves):
+            total += amplitude * value_noise(
+                x * frequency, z * frequency, self.seed + octave
+            )
+            amplitude *= 0.5
+            frequency *= 2.0
+        return flatten_arena(x, z, GROUND_HEIGHT + total * self.height * 0.5)
+
+
+# heights from a grayscale image centered on the origin, edges are clamped
+class ImageHeightField:
+    def __init__(self, path, units_per_pixel=2.0, height=40.0):
+        surface = pygame.image.load(path)
+        pixels = pygame.surfarray.array3d(surface).astype(np.float64)
+        self.values = pixels.mean(axis=2) / 255.0  # indexed [x, y]
+        self.units_per_pixel = units_per_pixel
+        self.height = height
+        # the image covers this far from the origin, at least the arena
+        width, depth = self.values.shape
+        self.half_size = max(ARENA_HALF_SIZE, min(width, depth) * units_per_pixel / 2)
+
+    def heights(self, x, z):
+        width, depth = self.values.shape
+        u = np.clip(x / self.units_per_pixel + width / 2, 0, width - 1)
+        v = np.clip(z / self.units_per_pixel + depth / 2, 0, depth - 1)
+        u0 = np.minimum(np.floor(u).astype(np.int64), width - 2)
+        v0 = np.minimum(np.floor(v).astype(np.int64), depth - 2)
+        fu = u - u0
+        fv = v - v0
+        values = self.values
+        top = values[u0, v0] * (1 - fu) + values[u0 + 1, v0] * fu
+        bottom = values[u0, v0 + 1] * (1 - fu) + values[u0 + 1, v0 + 1] * fu
+        sampled = top * (1 - fv) + bottom * fv
+        return flatten_arena(x, z, GROUND_HEIGHT + sampled * self.height)
+
+
+# ground height under a single point
+def height_at(height_field, x, z):
+    return float(height_field.heights(np.array([x]), np.array([z]))[0])
+
+
+# height field named by --terrain, None for the flat ground
+def create_height_field(name, seed):
+    if name == "flat":
+        return None
+    if name == "procedural":
+        return NoiseHeightField(seed)
+    return ImageHeightField(name)
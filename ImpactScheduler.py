@@ -0,0 +1,197 @@
+import heapq
+import numpy as np
+
+
+# range of times where origin + slope * (t - t0) stays within [low, high], for
+# arrays of lines. a line with no slope is inside always or never
+def slab_interval(origin, slope, low, high, t0):
+    flat = np.abs(slope) < 1e-12
+    safe = np.where(flat, 1.0, slope)
+    t1 = t0 + (low - origin) / safe
+    t2 = t0 + (high - origin) / safe
+    inside = (origin >= low) & (origin <= high)
+    enter = np.where(flat, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2))
+    exit = np.where(flat, np.where(inside, np.inf, -np.inf), np.maximum(t1, t2))
+    return enter, exit
+
+
+# solves when shots reach targets instead of sweeping every bullet against
+# every target each tick. targets move along closed form sines, so when a
+# shot is fired its earliest impact is found once and queued, and the queue
+# is drained as simulation time passes. an impact is only acted on if the
+# shot still exists and the target is still the one it was aimed at, a shot
+# whose target died first is solved again against the remaining targets
+class ImpactScheduler:
+    def __init__(self, targets, bullets, hitbox_scale, tolerance=1e-3, max_steps=256):
+        self.targets = targets
+        self.bullets = bullets
+        self.hitbox_scale = hitbox_scale
+        self.tolerance = tolerance  # distance counted as touching
+        self.max_steps = max_steps
+
+        # (impact time, sequence, shot id, target, target generation)
+        self.queue = []
+        self.sequence = 0
+        # shot id -> (origin, direction, fire time), oldest first
+        self.shots = {}
+        # bumped when a target slot starts a new life, so impacts solved
+        # against the previous occupant are ignored
+        self.generation = np.zeros(len(targets), dtype=np.int64)
+
+        # stats
+        self.solves = 0
+        self.unresolved = 0  # pairs given up on after max_steps
+
+    # offset between simulation time and each target's own elapsed time
+    def time_offsets(self, indices, now):
+        return self.targets.elapsed_time[indices] - now
+
+    # earliest time in [start, fire time + lifetime] at which the shot is
+    # inside one of the hitboxes, as (time, target index) or None
+    def earliest_impact(self, shot, start, now, indices=None):
+        origin, direction, fire_time = shot
+        targets = self.targets
+        if indices is None:
+            indices = np.flatnonzero(targets.alive & targets.analytic)
+        if len(indices) == 0:
+            return None
+        self.solves += 1
+
+        speed = self.bullets.speed
+        velocity = direction * speed
+        end = fire_time + self.bullets.lifetime
+        half_x = targets.size[indices] / 2 * self.hitbox_scale
+        half_y = targets.size[indices] / 2
+        initial = targets.initial[indices]
+        amplitude = targets.amplitude[indices]
+
+        # the hitbox never leaves the box swept by its full swing, so the
+        # shot can only hit while it is inside that box. this narrows the
+        # search to a short window per target, or rules the target out
+        center_y = targets.hitbox_position[indices, 1]
+        windows = [
+            slab_interval(
+                origin[1], velocity[1], center_y - half_y, center_y + half_y, fire_time
+            )
+        ]
+        for axis, column in ((0, 0), (2, 1)):
+            reach = amplitude[:, column] + half_x
+            windows.append(
+                slab_interval(
+                    origin[axis],
+                    velocity[axis],
+                    initial[:, column] - reach,
+                    initial[:, column] + reach,
+                    fire_time,
+                )
+            )
+        low = np.maximum.reduce(
+            [w[0] for w in windows] + [np.full(len(indices), start)]
+        )
+        high = np.minimum.reduce([w[1] for w in windows] + [np.full(len(indices), end)])
+        candidates = low <= high
+        if not candidates.any():
+            return None
+
+        indices = indices[candidates]
+        t = low[candidates]
+        high = high[candidates]
+        half_x = half_x[candidates]
+        initial = initial[candidates]
+        amplitude = amplitude[candidates]
+        frequency = targets.frequency[indices]
+        phase = targets.phase[indices]
+        offset = self.time_offsets(indices, now)
+
+        # conservative advancement: the gap on an axis can shrink no faster
+        # than the bullet speed plus the target's peak speed along it, so
+        # stepping by gap / that rate never steps past the first contact
+        rate_x = np.abs(velocity[0]) + amplitude[:, 0] * frequency[:, 0]
+        rate_z = np.abs(velocity[2]) + amplitude[:, 1] * frequency[:, 1]
+        min_step = self.tolerance / np.maximum(np.maximum(rate_x, rate_z), 1e-9)
+        hit = np.zeros(len(indices), dtype=bool)
+        active = np.ones(len(indices), dtype=bool)
+        for _ in range(self.max_steps):
+            angle = frequency * (t + offset)[:, None] + phase
+            target_x = initial[:, 0] + amplitude[:, 0] * np.sin(angle[:, 0])
+            target_z = initial[:, 1] + amplitude[:, 1] * np.cos(angle[:, 1])
+            flight = t - fire_time
+            gap_x = np.abs(origin[0] + velocity[0] * flight - target_x) - half_x
+            gap_z = np.abs(origin[2] + velocity[2] * flight - target_z) - half_x
+
+            touching = active & (gap_x <= self.tolerance) & (gap_z <= self.tolerance)
+            hit |= touching
+            active &= ~touching
+            step = np.maximum(np.maximum(gap_x / rate_x, gap_z / rate_z), min_step)
+            t = np.where(active, t + step, t)
+            active &= t <= high
+            if not active.any():
+                break
+        self.unresolved += int(np.count_nonzero(active))
+
+        if not hit.any():
+            return None
+        # earliest impact, ties go to the lowest target index
+        times = np.where(hit, t, np.inf)
+        first = int(np.argmin(times))
+        return float(times[first]), int(indices[first])
+
+    def push(self, shot_id, impact):
+        if impact is None:
+            return
+        time, index = impact
+        self.sequence += 1
+        heapq.heappush(
+            self.queue, (time, self.sequence, shot_id, index, self.generation[index])
+        )
+
+    # registers a freshly fired shot, `now` is the time it left the gun
+    def add_shot(self, shot_id, origin, direction, now):
+        shot = (np.array(origin, dtype=np.float64), np.array(direction), now)
+        shot_id = int(shot_id)
+        self.shots[shot_id] = shot
+        self.push(shot_id, self.earliest_impact(shot, now, now))
+
+    # a target slot was (re)filled: shots already in flight may reach it
+    # before their queued impact, so each one is solved against it alone
+    def add_target(self, index, now):
+        if index >= len(self.generation):
+            grown = np.zeros(len(self.targets), dtype=np.int64)
+            grown[: len(self.generation)] = self.generation
+            self.generation = grown
+        self.generation[index] += 1
+        indices = np.array([index])
+        for shot_id, shot in self.shots.items():
+            self.push(shot_id, self.earliest_impact(shot, now, now, indices))
+
+    # shots that outlived the bullet lifetime can never hit anything
+    def forget_expired(self, now):
+        lifetime = self.bullets.lifetime
+        while self.shots:
+            shot_id = next(iter(self.shots))
+            if self.shots[shot_id][2] + lifetime > now:
+                break
+            del self.shots[shot_id]
+
+    # pops every impact up to `until` and returns the valid ones as
+    # (shot id, target index) pairs, in time order. `now` is the simulation
+    # time the targets' elapsed times correspond to
+    def resolve(self, until, now):
+        impacts = []
+        live_shots = set(self.bullets.ids[: len(self.bullets)].tolist())
+        while self.queue and self.queue[0][0] <= until:
+            time, _, shot_id, index, generation = heapq.heappop(self.queue)
+            shot = self.shots.get(shot_id)
+            if shot is None or shot_id not in live_shots:
+                # already hit something, or recycled by a full bullet pool
+                continue
+            if not self.targets.alive[index] or generation != self.generation[index]:
+                # the target went first, look for the next one along the path
+                self.push(shot_id, self.earliest_impact(shot, time, now))
+                continue
+            del self.shots[shot_id]
+            live_shots.discard(shot_id)
+            impacts.append((shot_id, index))
+            self.targets.kill(index)
+        self.forget_expired(until)
+        return impacts
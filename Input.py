@@ -0,0 +1,162 @@
+import math
+import random
+from collections import namedtuple
+import numpy as np
+import pygame
+
+# everything the simulation reads from the player in one step
+InputFrame = namedtuple(
+    "InputFrame",
+    ["mouse_dx", "mouse_dy", "forward", "back", "left", "right", "sprint", "fire"],
+)
+
+IDLE_INPUT = InputFrame(0.0, 0.0, False, False, False, False, False, False)
+
+
+# reads the live mouse and keyboard, recentering the grabbed mouse. returns
+# idle input while the mouse is released (escape) so the player stops
+def read_pygame_input(width, height):
+    if pygame.mouse.get_visible():
+        return IDLE_INPUT
+
+    mouse_pos = pygame.mouse.get_pos()
+    center_pos = (width / 2, height / 2)
+    pygame.mouse.set_pos(center_pos)
+
+    keys = pygame.key.get_pressed()
+    buttons = pygame.mouse.get_pressed()
+    return InputFrame(
+        mouse_pos[0] - center_pos[0],
+        mouse_pos[1] - center_pos[1],
+        bool(keys[pygame.K_w]),
+        bool(keys[pygame.K_s]),
+        bool(keys[pygame.K_a]),
+        bool(keys[pygame.K_d]),
+        bool(keys[pygame.K_LSHIFT]),
+        bool(buttons[0]),
+    )
+
+
+# plays back a fixed list of frames, then stays idle
+class ScriptedInput:
+    def __init__(self, frames, loop=False):
+        self.frames = list(frames)
+        self.loop = loop
+        self.index = 0
+
+    def finished(self):
+        return not self.loop and self.index >= len(self.frames)
+
+    def next_frame(self, simulation):
+        if self.index >= len(self.frames):
+            if not self.loop or not self.frames:
+                return IDLE_INPUT
+            self.index = 0
+        frame = self.frames[self.index]
+        self.index += 1
+        return frame
+
+
+# seeded random player that wanders, looks around and holds fire
+class SyntheticInput:
+    def __init__(self, seed=0, turn_speed=8.0, change_interval=30):
+        self.random = random.Random(seed)
+        self.turn_speed = turn_speed
+        self.change_interval = change_interval
+        self.ticks = 0
+        self.current = IDLE_INPUT
+
+    def next_frame(self, simulation):
+        if self.ticks % self.change_interval == 0:
+            rng = self.random
+            self.current = InputFrame(
+                rng.uniform(-self.turn_speed, self.turn_speed),
+                rng.uniform(-self.turn_speed, self.turn_speed) * 0.25,
+                rng.random() < 0.5,
+                rng.random() < 0.1,
+                rng.random() < 0.2,
+                rng.random() < 0.2,
+                rng.random() < 0.3,
+                rng.random() < 0.7,
+            )
+        self.ticks += 1
+        return self.current
+
+
+# scripted aim bot for soak tests: turns toward the nearest live target,
+# leading it by the bullet flight time, and fires once the aim is close
+class AimBotInput:
+    def __init__(
+        self,
+        max_turn=6.0,
+        bullet_speed=150.0,
+        fire_tolerance=0.4,
+        aim_jitter=0.0,
+        seed=0,
+    ):
+        self.max_turn = max_turn  # degrees per tick
+        self.aim_jitter = aim_jitter  # standard deviation of aim noise in degrees
+        self.random = random.Random(seed)
+        self.bullet_speed = bullet_speed
+        self.fire_tolerance = fire_tolerance  # allowed miss distance in units
+
+    def next_frame(self, simulation):
+        camera = simulation.camera
+        targets = simulation.targets
+        indices = targets.live_indices()
+        if len(indices) == 0:
+            return IDLE_INPUT
+
+        # bullets leave from the gun, not the eye
+        muzzle = (
+            np.array(camera.eye)
+            + np.array(camera.right) * 0.6
+            - np.array(camera.up) * 0.15
+            - np.array(camera.forward) * 0.3
+        )
+        offsets = targets.hitbox_position[indices] - muzzle
+        nearest = int(np.argmin(np.einsum("ij,ij->i", offsets, offsets)))
+        index = indices[nearest]
+
+        # predict where the target will be when the bullet arrives
+        aim_point = targets.hitbox_position[index].copy()
+        for _ in range(2):
+            flight_time = np.linalg.norm(aim_point - muzzle) / self.bullet_speed
+            elapsed = targets.elapsed_time[index] + flight_time
+            angle = targets.frequency[index] * elapsed + targets.phase[index]
+            aim_point[0] = targets.initial[index, 0] + targets.amplitude[
+                index, 0
+            ] * math.sin(angle[0])
+            aim_point[2] = targets.initial[index, 1] + targets.amplitude[
+                index, 1
+            ] * math.cos(angle[1])
+
+        direction = aim_point - muzzle
+        distance = float(np.linalg.norm(direction))
+        direction /= distance
+        desired_yaw = math.degrees(math.atan2(direction[0], -direction[2]))
+        desired_pitch = math.degrees(math.asin(max(-1.0, min(1.0, direction[1]))))
+        if self.aim_jitter > 0:
+            desired_yaw += self.random.gauss(0.0, self.aim_jitter)
+            desired_pitch += self.random.gauss(0.0, self.aim_jitter)
+
+        # shortest way round, limited to the turn speed
+        yaw_error = (desired_yaw - camera.yaw + 180.0) % 360.0 - 180.0
+        pitch_error = desired_pitch - camera.pitch
+        yaw_turn = max(-self.max_turn, min(self.max_turn, yaw_error))
+        pitch_turn = max(-self.max_turn, min(self.max_turn, pitch_error))
+
+        # shots leave before this tick's turn, so fire on the current error
+        remaining = math.radians(math.hypot(yaw_error, pitch_error))
+        fire = remaining * distance < self.fire_tolerance
+
+        return InputFrame(
+            yaw_turn / camera.mouse_sensitivityX,
+            -pitch_turn / camera.mouse_sensitivityY,
+            False,
+            False,
+            False,
+            False,
+            False,
+            fire,
+        )
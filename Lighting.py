@@ -1,11 +1,13 @@
+import numpy as np
 from OpenGL.GL import *
 
 
 def Light():
-    ambientLight = [0.2, 0.2, 0.2, 1.0]
-    diffuseLight = [0.7, 0.7, 0.7, 1.0]
-    specularLight = [1.0, 1.0, 1.0, 1.0]
-    lightPos = [0.0, 10.0, 0.0, 1.0]
+    # float32 arrays so pyopengl can pass them without copying
+    ambientLight = np.array([0.2, 0.2, 0.2, 1.0], dtype=np.float32)
+    diffuseLight = np.array([0.7, 0.7, 0.7, 1.0], dtype=np.float32)
+    specularLight = np.array([1.0, 1.0, 1.0, 1.0], dtype=np.float32)
+    lightPos = np.array([0.0, 10.0, 0.0, 1.0], dtype=np.float32)
 
     glLightfv(GL_LIGHT0, GL_AMBIENT, ambientLight)
     glLightfv(GL_LIGHT0, GL_DIFFUSE, diffuseLight)
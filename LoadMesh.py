@@ -1,37 +1,26 @@
 from OpenGL.GL import *
 from Mesh import *
+from ObjParser import load_obj_cached, parse_obj, parse_obj_lines
 
 
+# mesh_data takes (vertices, triangles) that were already loaded, for example
+# by load_obj_cached on a worker thread
 class LoadMesh(Mesh):
-    def __init__(self, filename, draw_type):
+    def __init__(self, filename, draw_type, use_cache=True, mesh_data=None):
         self.vertices = []
         self.triangles = []
+        self.normals = None
+        self.texcoords = None
         self.filename = filename
         self.draw_type = draw_type
-        self.load_drawing()
+        if mesh_data is not None:
+            self.vertices, self.triangles = mesh_data
+        elif use_cache:
+            self.vertices, self.triangles = load_obj_cached(filename)
+        else:
+            self.vertices, self.triangles = parse_obj(filename)
+        self.build_arrays()
 
+    # original line by line parser, kept for reference and benchmarking
     def load_drawing(self):
-        with open(self.filename) as fp:
-            line = fp.readline()
-            while line:
-                if line.startswith("v "):  # Vertex data
-                    vx, vy, vz = [float(value) for value in line[2:].split()]
-                    self.vertices.append((vx, vy, vz))
-                elif line.startswith("f "):  # Face data
-                    face = line[2:].split()
-                    # Parse only the vertex indices from the face data
-                    face_indices = [int(value.split("/")[0]) - 1 for value in face]
-                    # Convert n-gon to triangles (fan triangulation)
-                    for i in range(1, len(face_indices) - 1):
-                        self.triangles.extend(
-                            [face_indices[0], face_indices[i], face_indices[i + 1]]
-                        )
-                line = fp.readline()
-
-    def draw(self):
-        for t in range(0, len(self.triangles), 3):  # Draw triangles
-            glBegin(self.draw_type)
-            glVertex3fv(self.vertices[self.triangles[t]])
-            glVertex3fv(self.vertices[self.triangles[t + 1]])
-            glVertex3fv(self.vertices[self.triangles[t + 2]])
-            glEnd()
+        self.vertices, self.triangles = parse_obj_lines(self.filename)
@@ -1,8 +1,14 @@
+import numpy as np
 import pygame
 from OpenGL.GL import *
+from AssetCache import cache_path, content_key, read_cache, write_cache
 
+TEXTURE_CACHE_SUFFIX = ".texcache"
+# bump when the decoded layout or the mip filter changes
+TEXTURE_CACHE_VERSION = 1
 
-def load_texture(path):
+
+def decode_image(path):
     # load image
     texture_surface = pygame.image.load(path)
 
@@ -12,30 +18,99 @@ def load_texture(path):
     # get image dimensions
     width = texture_surface.get_width()
     height = texture_surface.get_height()
+    return np.frombuffer(texture_data, dtype=np.uint8).reshape(height, width, 4)
+
+
+# halves the image with a 2x2 box filter, an odd last row or column is dropped
+def downsample(pixels):
+    height, width = pixels.shape[:2]
+    pixels = pixels.astype(np.float32)
+    if width > 1:
+        pixels = pixels[:, : width // 2 * 2]
+        pixels = (pixels[:, 0::2] + pixels[:, 1::2]) / 2
+    if height > 1:
+        pixels = pixels[: height // 2 * 2]
+        pixels = (pixels[0::2] + pixels[1::2]) / 2
+    return np.round(pixels).astype(np.uint8)
+
+
+# every mip level from the full image down to 1x1
+def build_mip_chain(pixels):
+    levels = [np.ascontiguousarray(pixels)]
+    while levels[-1].shape[0] > 1 or levels[-1].shape[1] > 1:
+        levels.append(downsample(levels[-1]))
+    return levels
+
+
+# decodes the image and builds its mip chain, or maps them straight from the
+# cache next to the image. needs no gl context, so it can run on any thread
+def load_texture_data(path):
+    cache = cache_path(path, TEXTURE_CACHE_SUFFIX)
+    key = "%d:%s" % (TEXTURE_CACHE_VERSION, content_key(path))
+    cached = read_cache(cache, key)
+    if cached is not None:
+        return [cached["level%d" % i] for i in range(len(cached))]
+
+    levels = build_mip_chain(decode_image(path))
+    write_cache(cache, key, {"level%d" % i: level for i, level in enumerate(levels)})
+    return levels
 
+
+def max_anisotropy():
+    try:
+        from OpenGL.GL.EXT.texture_filter_anisotropic import (
+            GL_MAX_TEXTURE_MAX_ANISOTROPY_EXT,
+            glInitTextureFilterAnisotropicEXT,
+        )
+    except ImportError:
+        return 1.0
+    if not glInitTextureFilterAnisotropicEXT():
+        return 1.0
+    return float(glGetFloatv(GL_MAX_TEXTURE_MAX_ANISOTROPY_EXT))
+
+
+# uploads a mip chain from load_texture_data, must run on the gl thread
+def upload_texture(levels, anisotropy=8.0):
     # generate texture id
     texture_id = glGenTextures(1)
 
-    # upload texture data to OpenGL
+    # upload every mip level to OpenGL
     glBindTexture(GL_TEXTURE_2D, texture_id)
-    glTexImage2D(
-        GL_TEXTURE_2D,
-        0,
-        GL_RGBA,
-        width,
-        height,
-        0,
-        GL_RGBA,
-        GL_UNSIGNED_BYTE,
-        texture_data,
-    )
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+    for level, pixels in enumerate(levels):
+        height, width = pixels.shape[:2]
+        glTexImage2D(
+            GL_TEXTURE_2D,
+            level,
+            GL_RGBA,
+            width,
+            height,
+            0,
+            GL_RGBA,
+            GL_UNSIGNED_BYTE,
+            np.ascontiguousarray(pixels),
+        )
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAX_LEVEL, len(levels) - 1)
 
     # set texture wrap for S(horizontal) and T(vertical) axis
     glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
     glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
 
-    # set texture filtering
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+    # trilinear filtering, the ground repeats the texture far into the distance
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
     glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
 
+    # anisotropic filtering keeps the ground sharp at grazing angles
+    anisotropy = min(anisotropy, max_anisotropy())
+    if anisotropy > 1.0:
+        from OpenGL.GL.EXT.texture_filter_anisotropic import (
+            GL_TEXTURE_MAX_ANISOTROPY_EXT,
+        )
+
+        glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MAX_ANISOTROPY_EXT, anisotropy)
+
     return texture_id
+
+
+def load_texture(path):
+    return upload_texture(load_texture_data(path))
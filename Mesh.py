@@ -1,24 +1,184 @@
+import numpy as np
 from OpenGL.GL import *
 
 
 class Mesh:
-    def __init__(self):
-        self.vertices = [
-            (0.5, -0.5, 0.5),
-            (-0.5, -0.5, 0.5),
-            (0.5, 0.5, 0.5),
-            (-0.5, 0.5, 0.5),
-            (0.5, 0.5, -0.5),
-            (-0.5, 0.5, -0.5),
+    def __init__(
+        self,
+        vertices=None,
+        triangles=None,
+        draw_type=GL_TRIANGLES,
+        normals=None,
+        texcoords=None,
+    ):
+        if vertices is None:
+            vertices = [
+                (0.5, -0.5, 0.5),
+                (-0.5, -0.5, 0.5),
+                (0.5, 0.5, 0.5),
+                (-0.5, 0.5, 0.5),
+                (0.5, 0.5, -0.5),
+                (-0.5, 0.5, -0.5),
+            ]
+            triangles = [0, 2, 3, 0, 3, 1]
+        self.vertices = vertices
+        self.triangles = triangles
+        self.normals = normals
+        self.texcoords = texcoords
+        self.draw_type = draw_type
+        self.build_arrays()
+
+    # pack the vertex and index data into contiguous arrays once
+    def build_arrays(self):
+        self.vertex_array = np.ascontiguousarray(
+            self.vertices, dtype=np.float32
+        ).reshape(-1, 3)
+        self.index_array = np.ascontiguousarray(self.triangles, dtype=np.uint32).ravel()
+        if self.normals is not None:
+            self.normal_array = np.ascontiguousarray(
+                self.normals, dtype=np.float32
+            ).reshape(-1, 3)
+        else:
+            self.normal_array = None
+        if self.texcoords is not None:
+            self.texcoord_array = np.ascontiguousarray(
+                self.texcoords, dtype=np.float32
+            ).reshape(-1, 2)
+        else:
+            self.texcoord_array = None
+
+        # buffer objects are created lazily because they need a gl context
+        self.vertex_buffer = None
+        self.normal_buffer = None
+        self.texcoord_buffer = None
+        self.index_buffer = None
+        self.use_vertex_arrays = True
+        self.use_buffers = True
+
+    # create the vertex buffer objects, falls back to client side arrays
+    # when the driver does not support them
+    def upload(self):
+        if self.vertex_buffer is not None or not self.use_buffers:
+            return
+        if not bool(glGenBuffers):
+            self.use_buffers = False
+            return
+
+        self.vertex_buffer = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glBufferData(
+            GL_ARRAY_BUFFER, self.vertex_array.nbytes, self.vertex_array, GL_STATIC_DRAW
+        )
+
+        if self.normal_array is not None:
+            self.normal_buffer = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.normal_buffer)
+            glBufferData(
+                GL_ARRAY_BUFFER,
+                self.normal_array.nbytes,
+                self.normal_array,
+                GL_STATIC_DRAW,
+            )
+        if self.texcoord_array is not None:
+            self.texcoord_buffer = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.texcoord_buffer)
+            glBufferData(
+                GL_ARRAY_BUFFER,
+                self.texcoord_array.nbytes,
+                self.texcoord_array,
+                GL_STATIC_DRAW,
+            )
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        self.index_buffer = glGenBuffers(1)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        glBufferData(
+            GL_ELEMENT_ARRAY_BUFFER,
+            self.index_array.nbytes,
+            self.index_array,
+            GL_STATIC_DRAW,
+        )
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    def release(self):
+        buffers = [
+            b
+            for b in (
+                self.vertex_buffer,
+                self.normal_buffer,
+                self.texcoord_buffer,
+                self.index_buffer,
+            )
+            if b is not None
         ]
-        self.triangles = [0, 2, 3, 0, 3, 1]
-        self.draw_type = GL_TRIANGLES
+        if buffers:
+            glDeleteBuffers(len(buffers), np.array(buffers, dtype=np.uint32))
+        self.vertex_buffer = None
+        self.normal_buffer = None
+        self.texcoord_buffer = None
+        self.index_buffer = None
 
     def draw(self):
+        if not self.use_vertex_arrays:
+            self.draw_immediate()
+            return
+
+        try:
+            self.draw_arrays()
+        except GLError:
+            # old drivers without vertex array support use the slow path
+            self.use_vertex_arrays = False
+            self.draw_immediate()
+
+    # draws every triangle with a single indexed draw call
+    def draw_arrays(self):
+        self.upload()
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        if self.normal_array is not None:
+            glEnableClientState(GL_NORMAL_ARRAY)
+        if self.texcoord_array is not None:
+            glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+
+        if self.vertex_buffer is not None:
+            glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+            glVertexPointer(3, GL_FLOAT, 0, None)
+            if self.normal_buffer is not None:
+                glBindBuffer(GL_ARRAY_BUFFER, self.normal_buffer)
+                glNormalPointer(GL_FLOAT, 0, None)
+            if self.texcoord_buffer is not None:
+                glBindBuffer(GL_ARRAY_BUFFER, self.texcoord_buffer)
+                glTexCoordPointer(2, GL_FLOAT, 0, None)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+            glDrawElements(self.draw_type, len(self.index_array), GL_UNSIGNED_INT, None)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+        else:
+            glVertexPointer(3, GL_FLOAT, 0, self.vertex_array)
+            if self.normal_array is not None:
+                glNormalPointer(GL_FLOAT, 0, self.normal_array)
+            if self.texcoord_array is not None:
+                glTexCoordPointer(2, GL_FLOAT, 0, self.texcoord_array)
+            glDrawElements(
+                self.draw_type, len(self.index_array), GL_UNSIGNED_INT, self.index_array
+            )
+
+        if self.texcoord_array is not None:
+            glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        if self.normal_array is not None:
+            glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+    # immediate mode fallback, one vertex call per corner
+    def draw_immediate(self):
+        vertices = self.vertex_array
+        normals = self.normal_array
+        texcoords = self.texcoord_array
         glBegin(self.draw_type)
-        for t in range(0, len(self.triangles), 3):  # t=0,3
-            glBegin(self.draw_type)
-            glVertex3fv(self.vertices[self.triangles[t]])
-            glVertex3fv(self.vertices[self.triangles[t + 1]])
-            glVertex3fv(self.vertices[self.triangles[t + 2]])
-            glEnd()
+        for i in self.index_array:
+            if normals is not None:
+                glNormal3fv(normals[i])
+            if texcoords is not None:
+                glTexCoord2fv(texcoords[i])
+            glVertex3fv(vertices[i])
+        glEnd()
@@ -0,0 +1,124 @@
+import numpy as np
+from AssetCache import cache_path, mtime_key, read_cache, write_cache
+
+# obj parsing without gl, so build machines and the benchmarks can load meshes
+
+MESH_CACHE_SUFFIX = ".meshcache"
+
+# ascii codes the parser looks for
+SLASH = ord("/")
+NEWLINE = ord("\n")
+SPACE = ord(" ")
+
+
+# bytes of every line that starts with `keyword` and a blank, without the
+# keyword, each line still ending in a newline. returns them and the count
+def keyword_lines(data, line_starts, line_lengths, keyword):
+    first = data[line_starts]
+    second = data[np.minimum(line_starts + 1, len(data) - 1)]
+    matches = (first == ord(keyword)) & (second <= SPACE) & (second != NEWLINE)
+    mask = np.repeat(matches, line_lengths)
+    mask[line_starts[matches]] = False
+    mask[line_starts[matches] + 1] = False
+    return data[mask], int(np.count_nonzero(matches))
+
+
+# the whole file is handled as one byte array, so there is no python work per
+# line, vertex or face
+def parse_obj(filename):
+    with open(filename, "rb") as fp:
+        data = np.frombuffer(fp.read() + b"\n", dtype=np.uint8)
+
+    line_ends = np.flatnonzero(data == NEWLINE)
+    line_starts = np.concatenate([[0], line_ends[:-1] + 1])
+    line_lengths = line_ends + 1 - line_starts
+
+    # parse every vertex in one go, only x y z are used
+    vertex_text, vertex_count = keyword_lines(data, line_starts, line_lengths, "v")
+    vertices = np.fromstring(vertex_text.tobytes(), dtype=np.float32, sep=" ")
+    vertices = vertices.reshape(vertex_count, -1)[:, :3]
+
+    text, face_count = keyword_lines(data, line_starts, line_lengths, "f")
+    if face_count == 0:
+        return vertices, np.zeros(0, dtype=np.uint32)
+
+    # a token starts at every non blank byte that follows a blank one, each
+    # face is one line
+    blank = text <= SPACE
+    start = ~blank
+    start[1:] &= blank[:-1]
+    starts = np.flatnonzero(start)
+    face_ends = np.flatnonzero(text == NEWLINE)
+    counts = np.bincount(np.searchsorted(face_ends, starts), minlength=face_count)
+
+    # blank out the "/vt/vn" part of each token so only vertex indices remain
+    slashes = np.cumsum(text == SLASH, dtype=np.int32)
+    token = np.cumsum(start, dtype=np.int32) - 1
+    text[~blank & (slashes > slashes[starts][token])] = SPACE
+    indices = np.fromstring(text.tobytes(), dtype=np.int64, sep=" ")
+
+    # obj indices are 1 based, negative values count back from the end
+    indices = np.where(indices < 0, len(vertices) + indices, indices - 1)
+
+    return vertices, fan_triangulate(indices, counts)
+
+
+# convert n-gons to triangles (fan triangulation) for all faces at once
+def fan_triangulate(indices, counts):
+    face_starts = np.cumsum(counts) - counts
+    # points and lines have no triangles
+    face_starts = face_starts[counts >= 3]
+    counts = counts[counts >= 3]
+    if len(counts) == 0:
+        return np.zeros(0, dtype=np.uint32)
+
+    triangle_counts = counts - 2
+    triangle_face = np.repeat(np.arange(len(counts)), triangle_counts)
+
+    # i = 1 .. n - 2 inside each face
+    first_triangle = np.cumsum(triangle_counts) - triangle_counts
+    corner = np.arange(len(triangle_face)) - first_triangle[triangle_face] + 1
+
+    start = face_starts[triangle_face]
+    triangles = np.stack(
+        [indices[start], indices[start + corner], indices[start + corner + 1]], axis=1
+    )
+    return triangles.astype(np.uint32).ravel()
+
+
+# loads the mesh from the binary cache next to the source file, parsing and
+# refreshing the cache only when the obj has changed
+def load_obj_cached(filename):
+    path = cache_path(filename, MESH_CACHE_SUFFIX)
+    key = mtime_key(filename)
+
+    cached = read_cache(path, key)
+    if cached is not None:
+        return cached["vertices"], cached["triangles"]
+
+    vertices, triangles = parse_obj(filename)
+    write_cache(path, key, {"vertices": vertices, "triangles": triangles})
+    return vertices, triangles
+
+
+# original line by line parser, kept for reference and benchmarking
+def parse_obj_lines(filename):
+    vertices = []
+    triangles = []
+    with open(filename) as fp:
+        line = fp.readline()
+        while line:
+            if line.startswith("v "):  # Vertex data
+                vx, vy, vz = [float(value) for value in line[2:].split()]
+                vertices.append((vx, vy, vz))
+            elif line.startswith("f "):  # Face data
+                face = line[2:].split()
+                # Parse only the vertex indices from the face data
+                face_indices = [int(value.split("/")[0]) - 1 for value in face]
+                # Convert n-gon to triangles (fan triangulation)
+                for i in range(1, len(face_indices) - 1):
+                    triangles.extend(
+                        [face_indices[0], face_indices[i], face_indices[i + 1]]
+                    )
+            line = fp.readline()
+    return vertices, triangles
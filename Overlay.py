@@ -0,0 +1,118 @@
+import numpy as np
+import pygame
+from OpenGL.GL import *
+
+# one color per profiler stage, repeated if there are more stages
+STAGE_COLORS = [
+    (0.9, 0.3, 0.3),
+    (0.3, 0.9, 0.3),
+    (0.3, 0.5, 1.0),
+    (1.0, 0.9, 0.2),
+    (1.0, 0.5, 0.1),
+    (0.8, 0.3, 0.9),
+    (0.3, 0.9, 0.9),
+]
+
+# pixels per millisecond for the frame time bars
+BAR_SCALE = 4.0
+BAR_FRAMES = 120
+FRAME_BUDGET_MS = 1000.0 / 60.0
+
+overlay_font = None
+text_cache = {}
+
+
+def draw_text(text, x, y):
+    global overlay_font
+    if overlay_font is None:
+        overlay_font = pygame.font.SysFont("monospace", 14)
+
+    # rendering text is slow, so every string is rasterised once
+    cached = text_cache.get(text)
+    if cached is None:
+        if len(text_cache) > 256:
+            text_cache.clear()
+        surface = overlay_font.render(text, True, (255, 255, 255))
+        cached = (
+            surface.get_width(),
+            surface.get_height(),
+            pygame.image.tostring(surface, "RGBA", True),
+        )
+        text_cache[text] = cached
+
+    width, height, pixels = cached
+    glRasterPos2f(x, y)
+    glDrawPixels(width, height, GL_RGBA, GL_UNSIGNED_BYTE, pixels)
+    return height
+
+
+# stacked bar per recent frame, one color per stage, as quad vertex and color
+# arrays
+def bar_arrays(stage_times, left, bottom):
+    frames, stages = stage_times.shape
+    heights = stage_times * BAR_SCALE
+    tops = bottom + np.cumsum(heights, axis=1)
+    bases = tops - heights
+    x = left + np.arange(frames)[:, None] * 2.0
+    x = np.broadcast_to(x, (frames, stages))
+
+    vertices = np.empty((frames, stages, 4, 2), dtype=np.float32)
+    vertices[:, :, 0] = np.stack([x, bases], axis=-1)
+    vertices[:, :, 1] = np.stack([x + 2, bases], axis=-1)
+    vertices[:, :, 2] = np.stack([x + 2, tops], axis=-1)
+    vertices[:, :, 3] = np.stack([x, tops], axis=-1)
+
+    palette = np.array(STAGE_COLORS, dtype=np.float32)
+    colors = palette[np.arange(stages) % len(palette)]
+    colors = np.broadcast_to(colors[None, :, None, :], (frames, stages, 4, 3))
+    return vertices.reshape(-1, 2), np.ascontiguousarray(colors.reshape(-1, 3))
+
+
+# draws in screen pixels with lighting and depth test off, the render queue
+# sets that up
+def draw_profiler_overlay(profiler, screen_width, screen_height):
+    frame_times, stage_times = profiler.recent()
+    stage_times = stage_times[-BAR_FRAMES:] * 1000
+    left = 10
+    bottom = 10
+    if stage_times.size:
+        vertices, colors = bar_arrays(stage_times, left, bottom)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(2, GL_FLOAT, 0, vertices)
+        glColorPointer(3, GL_FLOAT, 0, colors)
+        glDrawArrays(GL_QUADS, 0, len(vertices))
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+    # 60 fps budget line
+    budget = bottom + FRAME_BUDGET_MS * BAR_SCALE
+    glColor3f(1, 1, 1)
+    glBegin(GL_LINES)
+    glVertex2f(left, budget)
+    glVertex2f(left + BAR_FRAMES * 2, budget)
+    glEnd()
+
+    # percentile table with a color key, top left
+    y = screen_height - 20
+    y -= draw_text(f"{'':<10}{'p50':>6}{'p95':>7}{'p99':>7}", 25, y) + 2
+    for name, values in profiler.percentiles().items():
+        if name in profiler.stage_index:
+            stage = profiler.stage_index[name]
+            glColor3f(*STAGE_COLORS[stage % len(STAGE_COLORS)])
+            glBegin(GL_QUADS)
+            glVertex2f(10, y + 2)
+            glVertex2f(20, y + 2)
+            glVertex2f(20, y + 12)
+            glVertex2f(10, y + 12)
+            glEnd()
+        line = (
+            f"{name:<10}{values['p50']:6.2f}{values['p95']:7.2f}{values['p99']:7.2f} ms"
+        )
+        y -= draw_text(line, 25, y) + 2
+
+    # per frame counters below the table
+    glColor3f(1, 1, 1)
+    for name, value in profiler.counters.items():
+        y -= draw_text(f"{name:<10}{value:>6}", 25, y) + 2
+    glColor3f(1, 1, 1)
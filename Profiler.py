@@ -0,0 +1,115 @@
+import csv
+import time
+import numpy as np
+
+# stages of one frame in the order the game loop runs them
+FRAME_STAGES = ["input", "camera", "targets", "bullets", "collision", "display", "flip"]
+
+
+# records how long each stage of a frame took into a ring buffer of the most
+# recent frames, optionally writing every frame to a csv file as well
+class FrameProfiler:
+    def __init__(self, stages=FRAME_STAGES, capacity=600, csv_path=None):
+        self.stages = list(stages)
+        self.stage_index = {stage: i for i, stage in enumerate(self.stages)}
+        self.capacity = capacity
+        self.stage_times = np.zeros((capacity, len(self.stages)))
+        self.frame_times = np.zeros(capacity)
+        self.frames = 0  # total frames recorded, not capped by the capacity
+        self.counters = {}  # latest value of each per frame counter
+
+        self.current = np.zeros(len(self.stages))
+        self.frame_start = 0.0
+        self.last_mark = 0.0
+
+        self.csv_file = None
+        self.csv_writer = None
+        if csv_path:
+            self.csv_file = open(csv_path, "w", newline="")
+            self.csv_writer = csv.writer(self.csv_file)
+            self.csv_writer.writerow(
+                ["frame", "frame_ms"] + [stage + "_ms" for stage in self.stages]
+            )
+
+    def begin_frame(self):
+        self.current[:] = 0.0
+        self.frame_start = self.last_mark = time.perf_counter()
+
+    # charges the time since the previous mark to `stage`
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.current[self.stage_index[stage]] += now - self.last_mark
+        self.last_mark = now
+
+    # records a per frame count such as culled objects, shown by the overlay
+    def count(self, name, value):
+        self.counters[name] = value
+
+    def end_frame(self):
+        frame_time = time.perf_counter() - self.frame_start
+        slot = self.frames % self.capacity
+        self.stage_times[slot] = self.current
+        self.frame_times[slot] = frame_time
+
+        if self.csv_writer is not None:
+            self.csv_writer.writerow(
+                [self.frames, f"{frame_time * 1000:.4f}"]
+                + [f"{value * 1000:.4f}" for value in self.current]
+            )
+        self.frames += 1
+
+    # recorded frames oldest first
+    def recent(self):
+        count = min(self.frames, self.capacity)
+        if self.frames <= self.capacity:
+            order = np.arange(count)
+        else:
+            order = (np.arange(count) + self.frames) % self.capacity
+        return self.frame_times[order], self.stage_times[order]
+
+    # p50 / p95 / p99 of the recent frame times and stage times in milliseconds
+    def percentiles(self):
+        frame_times, stage_times = self.recent()
+        if len(frame_times) == 0:
+            return {}
+        names = ("p50", "p95", "p99")
+        report = {
+            "frame": dict(zip(names, np.percentile(frame_times, [50, 95, 99]) * 1000))
+        }
+        stage_percentiles = np.percentile(stage_times, [50, 95, 99], axis=0) * 1000
+        for i, stage in enumerate(self.stages):
+            report[stage] = dict(zip(names, stage_percentiles[:, i]))
+        return report
+
+    def summary(self):
+        lines = []
+        for name, values in self.percentiles().items():
+            lines.append(
+                f"{name:<10} p50 {values['p50']:7.3f} ms  "
+                f"p95 {values['p95']:7.3f} ms  p99 {values['p99']:7.3f} ms"
+            )
+        return "\n".join(lines)
+
+    def close(self):
+        if self.csv_file is not None:
+            self.csv_file.close()
+            self.csv_file = None
+            self.csv_writer = None
+
+
+# stands in for the profiler when nothing is being measured
+class NullProfiler:
+    def begin_frame(self):
+        pass
+
+    def mark(self, stage):
+        pass
+
+    def end_frame(self):
+        pass
+
+    def count(self, name, value):
+        pass
+
+    def close(self):
+        pass
@@ -0,0 +1,111 @@
+from collections import namedtuple
+from OpenGL.GL import *
+from OpenGL.GLU import gluOrtho2D
+
+# layers in drawing order, the world with the camera's projection and the
+# screen in pixels on top of it
+WORLD = 0
+SCREEN = 1
+
+# everything a queued draw needs set before it runs. texture 0 draws
+# untextured, the primitive does not change any gl state but keeps draws of
+# the same kind next to each other
+RenderState = namedtuple(
+    "RenderState", ["layer", "blend", "depth", "lighting", "texture", "primitive"]
+)
+
+# the state initialise() leaves behind, every frame starts and ends in it
+DEFAULT_STATE = RenderState(WORLD, False, True, True, 0, GL_TRIANGLES)
+
+
+# order draws run in: world before screen, opaque before blended, depth
+# tested before not, lit before unlit, so going through a frame turns each
+# of those off at most once and the default state is where it starts
+def sort_key(state):
+    return (
+        state.layer,
+        state.blend,
+        not state.depth,
+        not state.lighting,
+        state.texture,
+        state.primitive,
+    )
+
+
+# collects the draws of a frame and runs them sorted by render state, so each
+# toggle happens once on the way through the frame instead of every draw
+# function switching state on and off again. draws with the same state keep
+# their submission order
+class RenderQueue:
+    def __init__(self):
+        self.items = []
+        self.state_changes = 0  # gl state switches in the last flush
+
+    def submit(
+        self,
+        draw,
+        *args,
+        layer=WORLD,
+        blend=False,
+        depth=True,
+        lighting=True,
+        texture=0,
+        primitive=GL_TRIANGLES,
+    ):
+        state = RenderState(layer, blend, depth, lighting, texture, primitive)
+        self.items.append((sort_key(state), len(self.items), state, draw, args))
+
+    # runs every queued draw and returns what each one returned, in the
+    # order they were submitted
+    def flush(self, screen_width, screen_height):
+        items = sorted(self.items, key=lambda item: item[:2])
+        self.items = []
+        self.state_changes = 0
+        results = [None] * len(items)
+
+        current = DEFAULT_STATE
+        for _, order, state, draw, args in items:
+            current = self.apply(current, state, screen_width, screen_height)
+            results[order] = draw(*args)
+        self.apply(current, DEFAULT_STATE, screen_width, screen_height)
+        return results
+
+    def enable(self, capability, enabled):
+        if enabled:
+            glEnable(capability)
+        else:
+            glDisable(capability)
+        self.state_changes += 1
+
+    # switches only what differs between the two states
+    def apply(self, current, state, screen_width, screen_height):
+        if state.layer != current.layer:
+            if state.layer == SCREEN:
+                glMatrixMode(GL_PROJECTION)
+                glPushMatrix()
+                glLoadIdentity()
+                gluOrtho2D(0, screen_width, 0, screen_height)
+                glMatrixMode(GL_MODELVIEW)
+                glPushMatrix()
+                glLoadIdentity()
+            else:
+                glMatrixMode(GL_PROJECTION)
+                glPopMatrix()
+                glMatrixMode(GL_MODELVIEW)
+                glPopMatrix()
+            self.state_changes += 1
+        if state.blend != current.blend:
+            if state.blend:
+                glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+            self.enable(GL_BLEND, state.blend)
+        if state.depth != current.depth:
+            self.enable(GL_DEPTH_TEST, state.depth)
+        if state.lighting != current.lighting:
+            self.enable(GL_LIGHTING, state.lighting)
+        if state.texture != current.texture:
+            if (state.texture == 0) != (current.texture == 0):
+                self.enable(GL_TEXTURE_2D, state.texture != 0)
+            if state.texture != 0:
+                glBindTexture(GL_TEXTURE_2D, state.texture)
+                self.state_changes += 1
+        return state
@@ -0,0 +1,241 @@
+import argparse
+import hashlib
+import struct
+import time
+import numpy as np
+from Input import InputFrame, ScriptedInput
+from Profiler import FrameProfiler
+from Simulation import COLLISION_MODES, Simulation
+from Spawner import SPAWN_MODES
+
+# recording layout:
+#   header | one record per tick | end record
+# the header holds everything needed to rebuild the same simulation, followed
+# by the length prefixed terrain name since it decides the eye height, each tick
+# record is a flag byte plus the two mouse deltas, and the end record carries
+# the tick count and a checksum of the final state
+RECORDING_MAGIC = b"SHREC"
+RECORDING_VERSION = 5
+HEADER = struct.Struct("<5sHqIIdd4dBBdI")
+NAME_LENGTH = struct.Struct("<H")
+TICK = struct.Struct("<Bff")
+END = struct.Struct("<I32s")
+
+# flag bits of a tick record
+BUTTONS = ("forward", "back", "left", "right", "sprint", "fire")
+END_FLAG = 0x80
+
+
+def pack_frame(frame):
+    flags = 0
+    for bit, name in enumerate(BUTTONS):
+        if getattr(frame, name):
+            flags |= 1 << bit
+    return TICK.pack(flags, frame.mouse_dx, frame.mouse_dy)
+
+
+def unpack_frame(flags, mouse_dx, mouse_dy):
+    buttons = [bool(flags & (1 << bit)) for bit in range(len(BUTTONS))]
+    return InputFrame(mouse_dx, mouse_dy, *buttons)
+
+
+# hash of everything that decides how the rest of the game plays out, two runs
+# that diverge anywhere end up with different checksums
+def state_checksum(simulation):
+    digest = hashlib.sha256()
+    camera = simulation.camera
+    digest.update(
+        struct.pack(
+            "<10d",
+            camera.eye.x,
+            camera.eye.y,
+            camera.eye.z,
+            camera.yaw,
+            camera.pitch,
+            camera.forward.x,
+            camera.forward.y,
+            camera.forward.z,
+            camera.gun_recoil,
+            simulation.time_since_last_fire,
+        )
+    )
+    targets = simulation.targets
+    for column in (targets.position, targets.elapsed_time, targets.alive):
+        digest.update(np.ascontiguousarray(column).tobytes())
+    bullets = simulation.bullets
+    for column in (
+        bullets.positions(),
+        bullets.directions(),
+        bullets.age[: len(bullets)],
+    ):
+        digest.update(np.ascontiguousarray(column).tobytes())
+    digest.update(
+        struct.pack("<3q", simulation.ticks, simulation.shots_fired, simulation.hits)
+    )
+    return digest.digest()
+
+
+# writes the input of every simulation tick to a file, attach it with
+# `simulation.recorder = InputRecorder(path, simulation)`
+class InputRecorder:
+    def __init__(self, path, simulation):
+        self.file = open(path, "wb")
+        self.ticks = 0
+        self.file.write(
+            HEADER.pack(
+                RECORDING_MAGIC,
+                RECORDING_VERSION,
+                simulation.seed,
+                simulation.tick_rate,
+                simulation.num_targets,
+                simulation.hitbox_scale,
+                simulation.fire_rate,
+                *simulation.amplitude_range,
+                *simulation.frequency_range,
+                COLLISION_MODES.index(simulation.collision),
+                SPAWN_MODES.index(simulation.spawn),
+                simulation.spawn_interval,
+                simulation.waves,
+            )
+        )
+        terrain = simulation.terrain.encode("utf-8")
+        self.file.write(NAME_LENGTH.pack(len(terrain)) + terrain)
+
+    # returns the frame exactly as a replay will read it back, mouse deltas
+    # are stored as float32 so the live run has to use the rounded values too
+    def record(self, frame):
+        packed = pack_frame(frame)
+        self.file.write(packed)
+        self.ticks += 1
+        return unpack_frame(*TICK.unpack(packed))
+
+    # finishes the file with the tick count and final state checksum
+    def close(self, simulation):
+        if self.file is None:
+            return
+        self.file.write(struct.pack("<B8x", END_FLAG))
+        self.file.write(END.pack(self.ticks, state_checksum(simulation)))
+        self.file.close()
+        self.file = None
+
+
+class Recording:
+    def __init__(self, settings, frames, ticks, checksum):
+        self.settings = settings
+        self.frames = frames
+        self.ticks = ticks  # None if the recording was cut off
+        self.checksum = checksum
+
+    def create_simulation(self, **options):
+        return Simulation(**self.settings, **options)
+
+
+def load_recording(path):
+    with open(path, "rb") as fp:
+        data = fp.read()
+
+    (
+        magic,
+        version,
+        seed,
+        tick_rate,
+        num_targets,
+        hitbox_scale,
+        fire_rate,
+        amplitude_low,
+        amplitude_high,
+        frequency_low,
+        frequency_high,
+        collision,
+        spawn,
+        spawn_interval,
+        waves,
+    ) = HEADER.unpack_from(data, 0)
+    if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+        raise ValueError(f"{path} is not a version {RECORDING_VERSION} recording")
+
+    offset = HEADER.size
+    (terrain_length,) = NAME_LENGTH.unpack_from(data, offset)
+    offset += NAME_LENGTH.size
+    terrain = data[offset : offset + terrain_length].decode("utf-8")
+    offset += terrain_length
+
+    settings = {
+        "seed": seed,
+        "tick_rate": tick_rate,
+        "num_targets": num_targets,
+        "hitbox_scale": hitbox_scale,
+        "fire_rate": fire_rate,
+        "amplitude_range": (amplitude_low, amplitude_high),
+        "frequency_range": (frequency_low, frequency_high),
+        "collision": COLLISION_MODES[collision],
+        "spawn": SPAWN_MODES[spawn],
+        "spawn_interval": spawn_interval,
+        "waves": waves,
+        "terrain": terrain,
+    }
+
+    frames = []
+    ticks = None
+    checksum = None
+    while offset + TICK.size <= len(data):
+        flags, mouse_dx, mouse_dy = TICK.unpack_from(data, offset)
+        offset += TICK.size
+        if flags & END_FLAG:
+            if offset + END.size <= len(data):
+                ticks, checksum = END.unpack_from(data, offset)
+            break
+        frames.append(unpack_frame(flags, mouse_dx, mouse_dy))
+
+    return Recording(settings, frames, ticks, checksum)
+
+
+# feeds the recording through a fresh simulation as fast as possible and
+# reports the tick time profile and whether the final state matched
+def replay_headless(recording):
+    simulation = recording.create_simulation()
+    profiler = FrameProfiler(capacity=max(1, len(recording.frames)))
+    simulation.profiler = profiler
+    input_source = ScriptedInput(recording.frames)
+
+    start = time.perf_counter()
+    for _ in range(len(recording.frames)):
+        profiler.begin_frame()
+        simulation.step(simulation.tick_delta, input_source.next_frame(simulation))
+        profiler.end_frame()
+    elapsed = time.perf_counter() - start
+
+    return simulation, profiler, elapsed
+
+
+# compares the final state against the recording, returns a short verdict
+def verify(recording, simulation):
+    if recording.checksum is None:
+        return "no checksum in recording"
+    if state_checksum(simulation) == recording.checksum:
+        return "checksum match"
+    return "DIVERGED, final state does not match the recording"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="replay a recorded session headless")
+    parser.add_argument("recording")
+    args = parser.parse_args()
+
+    recording = load_recording(args.recording)
+    simulation, profiler, elapsed = replay_headless(recording)
+
+    print(f"ticks: {simulation.ticks}")
+    print(f"wall time: {elapsed:.3f} s")
+    if elapsed > 0:
+        print(f"ticks per second: {simulation.ticks / elapsed:.1f}")
+    print(profiler.summary())
+    print(f"checksum: {state_checksum(simulation).hex()}")
+    result = verify(recording, simulation)
+    print(result)
+    if result.startswith("DIVERGED"):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+import argparse
+import random
+import time
+import numpy as np
+from Camera import Camera
+from Target import create_targets, update_targets
+from Bullet import BulletPool, check_hits_batch, shoot_bullet
+from Broadphase import UniformGrid
+from Input import ScriptedInput, SyntheticInput
+from Profiler import NullProfiler
+from ImpactScheduler import ImpactScheduler
+from Spawner import SPAWN_MODES, TargetSpawner
+from HeightField import create_height_field
+
+# boundary limits
+GROUND_MIN_X = -49.0
+GROUND_MAX_X = 49.0
+GROUND_MIN_Z = -49.0
+GROUND_MAX_Z = 49.0
+
+# how far inside the terrain's edge the player is stopped
+GROUND_EDGE_MARGIN = 1.0
+
+# targets can wander this far past the ground edges
+TARGET_MARGIN = 10.0
+
+# "sweep" tests every bullet's path against the targets each tick,
+# "scheduled" solves each shot's impact time once when it is fired
+COLLISION_MODES = ("sweep", "scheduled")
+
+# longest frame the fixed step loop catches up on, anything beyond is dropped
+# so a stall does not turn into hundreds of ticks
+MAX_FRAME_TIME = 0.25
+
+
+# all game state and rules, stepped with input frames. nothing in here opens
+# a window or makes gl calls, so it runs the same on a build machine as in game
+class Simulation:
+    def __init__(
+        self,
+        num_targets=10,
+        seed=None,
+        hitbox_scale=0.5,
+        fire_rate=2.5,
+        tick_rate=60,
+        amplitude_range=(3.0, 10.0),
+        frequency_range=(0.5, 2.0),
+        collision="sweep",
+        spawn="none",
+        spawn_interval=5.0,
+        waves=0,
+        terrain="flat",
+        verbose=False,
+    ):
+        # a concrete seed is always picked so the session can be recorded
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.num_targets = num_targets
+        self.fire_rate = fire_rate
+        self.tick_rate = tick_rate
+        self.amplitude_range = tuple(amplitude_range)
+        self.frequency_range = tuple(frequency_range)
+        self.tick_delta = 1.0 / tick_rate
+        self.hitbox_scale = hitbox_scale
+        if collision not in COLLISION_MODES:
+            raise ValueError(f"unknown collision mode {collision!r}")
+        self.collision = collision
+        if spawn not in SPAWN_MODES:
+            raise ValueError(f"unknown spawn mode {spawn!r}")
+        self.spawn = spawn
+        self.spawn_interval = spawn_interval
+        self.waves = waves
+        # "flat", "procedural" or a heightmap image path
+        self.terrain = terrain
+        self.height_field = create_height_field(terrain, seed)
+        self.fire_interval = 1.0 / fire_rate
+        self.time_since_last_fire = 0.0
+        self.verbose = verbose
+        self.profiler = NullProfiler()
+
+        # optional input recorder, and a recorded input source that replaces
+        # the live input in advance()
+        self.recorder = None
+        self.replay = None
+
+        # camera init with boundary constraints, on terrain the player can
+        # walk out to its edges while the targets stay in the flat arena
+        ground_min_x, ground_max_x = GROUND_MIN_X, GROUND_MAX_X
+        ground_min_z, ground_max_z = GROUND_MIN_Z, GROUND_MAX_Z
+        if self.height_field is not None:
+            edge = self.height_field.half_size - GROUND_EDGE_MARGIN
+            ground_min_x, ground_max_x = -edge, edge
+            ground_min_z, ground_max_z = -edge, edge
+        self.camera = Camera(
+            ground_min_x=ground_min_x,
+            ground_max_x=ground_max_x,
+            ground_min_z=ground_min_z,
+            ground_max_z=ground_max_z,
+            height_field=self.height_field,
+        )
+        self.targets = create_targets(
+            num_targets, seed, self.amplitude_range, self.frequency_range
+        )
+        # the sweep's broadphase, the grid has to cover everywhere the
+        # targets can swing to. scheduled impacts do not need it
+        if collision == "sweep":
+            margin = max(TARGET_MARGIN, self.amplitude_range[1])
+            self.targets.attach_broadphase(
+                UniformGrid(
+                    GROUND_MIN_X - margin,
+                    GROUND_MAX_X + margin,
+                    GROUND_MIN_Z - margin,
+                    GROUND_MAX_Z + margin,
+                )
+            )
+        self.spawner = TargetSpawner(
+            self.targets,
+            spawn,
+            seed,
+            self.amplitude_range,
+            self.frequency_range,
+            spawn_interval,
+            waves,
+        )
+        self.bullets = BulletPool()
+        self.impacts = None
+        if collision == "scheduled":
+            self.impacts = ImpactScheduler(self.targets, self.bullets, hitbox_scale)
+
+        # fixed step state, frame time not yet simulated and mouse movement
+        # that arrived on frames where no tick ran
+        self.accumulator = 0.0
+        self.pending_mouse_dx = 0.0
+        self.pending_mouse_dy = 0.0
+
+        # stats
+        self.time = 0.0
+        self.ticks = 0
+        self.shots_fired = 0
+        self.hits = 0
+
+    def finished(self):
+        return self.spawner.finished()
+
+    # runs as many fixed ticks as the elapsed frame time allows and returns
+    # how far between the last two ticks the frame should be drawn (0..1)
+    def advance(self, frame_time, frame):
+        self.accumulator += min(frame_time, MAX_FRAME_TIME)
+        self.pending_mouse_dx += frame.mouse_dx
+        self.pending_mouse_dy += frame.mouse_dy
+
+        while self.accumulator >= self.tick_delta:
+            if self.replay is not None:
+                if self.replay.finished():
+                    # nothing left to play, hold on the last tick so alpha
+                    # stays in range
+                    self.accumulator = min(self.accumulator, self.tick_delta)
+                    break
+                tick_frame = self.replay.next_frame(self)
+            else:
+                # mouse movement is applied once, on the first tick of the frame
+                tick_frame = frame._replace(
+                    mouse_dx=self.pending_mouse_dx, mouse_dy=self.pending_mouse_dy
+                )
+                self.pending_mouse_dx = 0.0
+                self.pending_mouse_dy = 0.0
+            self.step(self.tick_delta, tick_frame)
+            self.accumulator -= self.tick_delta
+
+        return self.accumulator / self.tick_delta
+
+    def step(self, delta_time, frame):
+        if self.recorder is not None:
+            frame = self.recorder.record(frame)
+        self.time_since_last_fire += delta_time
+
+        # allow for holding down the mouse button to fire
+        if frame.fire and self.time_since_last_fire >= self.fire_interval:
+            slot = shoot_bullet(self.camera, self.bullets)
+            if self.impacts is not None:
+                self.impacts.add_shot(
+                    self.bullets.ids[slot],
+                    self.bullets.position[slot],
+                    self.bullets.direction[slot],
+                    self.time,
+                )
+            self.shots_fired += 1
+            self.time_since_last_fire = 0.0
+
+        self.camera.apply_input(frame, delta_time)
+        # apply recoil to the gun
+        self.camera.update_recoil(delta_time)
+        self.profiler.mark("camera")
+
+        # new targets start moving this tick, shots already in flight may
+        # reach them
+        for index in self.spawner.step(self.time):
+            if self.impacts is not None:
+                self.impacts.add_target(index, self.time)
+
+        # target movement
+        update_targets(self.targets, delta_time)
+        self.profiler.mark("targets")
+
+        # update bullet movement and check collision for all bullets at once
+        self.bullets.update(delta_time)
+        self.profiler.mark("bullets")
+        if self.impacts is None:
+            hits = check_hits_batch(
+                self.targets,
+                self.bullets.previous_positions(),
+                self.bullets.positions(),
+                self.hitbox_scale,
+                self.targets.broadphase,
+                self.verbose,
+            )
+        else:
+            hits = self.resolve_impacts(self.time + delta_time)
+        self.hits += int(np.count_nonzero(hits >= 0))
+
+        # remove bullets that hit something or ran out of lifetime
+        self.bullets.remove(np.flatnonzero((hits >= 0) | self.bullets.expired()))
+        self.profiler.mark("collision")
+
+        self.time += delta_time
+        self.ticks += 1
+
+    # hits from the impact scheduler up to `until`, in the same per bullet
+    # form as check_hits_batch. targets the scheduler cannot solve for are
+    # still swept
+    def resolve_impacts(self, until):
+        hits = np.full(len(self.bullets), -1, dtype=np.int64)
+        for shot_id, index in self.impacts.resolve(until, until):
+            hits[self.bullets.slot_of(shot_id)] = index
+            if self.verbose:
+                print(f"Target at {self.targets.position[index]} hit!")
+
+        swept = np.flatnonzero(self.targets.alive & ~self.targets.analytic)
+        if len(swept) > 0:
+            missed = hits < 0
+            swept_hits = check_hits_batch(
+                self.targets,
+                self.bullets.previous_positions()[missed],
+                self.bullets.positions()[missed],
+                self.hitbox_scale,
+                verbose=self.verbose,
+                candidates=swept,
+            )
+            hits[missed] = swept_hits
+        return hits
+
+
+# steps the simulation as fast as the cpu allows and returns a small report
+def run_headless(simulation, input_source, ticks):
+    start = time.perf_counter()
+    while simulation.ticks < ticks and not simulation.finished():
+        simulation.step(simulation.tick_delta, input_source.next_frame(simulation))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "ticks": simulation.ticks,
+        "sim_time": simulation.time,
+        "wall_time": elapsed,
+        "ticks_per_second": simulation.ticks / elapsed if elapsed > 0 else 0.0,
+        "shots_fired": simulation.shots_fired,
+        "hits": simulation.hits,
+        "targets_left": simulation.targets.live_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run the game without a window")
+    parser.add_argument("--ticks", type=int, default=36000)
+    parser.add_argument("--tick-rate", type=int, default=60)
+    parser.add_argument("--targets", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--input", choices=["synthetic", "idle"], default="synthetic")
+    parser.add_argument("--collision", choices=COLLISION_MODES, default="sweep")
+    parser.add_argument("--spawn", choices=SPAWN_MODES, default="none")
+    parser.add_argument("--spawn-interval", type=float, default=5.0)
+    parser.add_argument("--waves", type=int, default=0)
+    parser.add_argument("--terrain", default="flat", metavar="flat|procedural|PATH")
+    parser.add_argument("--record", metavar="PATH", help="record every tick's input")
+    args = parser.parse_args()
+
+    simulation = Simulation(
+        num_targets=args.targets,
+        seed=args.seed,
+        tick_rate=args.tick_rate,
+        collision=args.collision,
+        spawn=args.spawn,
+        spawn_interval=args.spawn_interval,
+        waves=args.waves,
+        terrain=args.terrain,
+    )
+    if args.input == "synthetic":
+        input_source = SyntheticInput(args.seed)
+    else:
+        input_source = ScriptedInput([])
+
+    if args.record:
+        # imported here because the replay module builds on this one
+        from Replay import InputRecorder
+
+        simulation.recorder = InputRecorder(args.record, simulation)
+
+    report = run_headless(simulation, input_source, args.ticks)
+    if simulation.recorder is not None:
+        simulation.recorder.close(simulation)
+    for key, value in report.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import heapq
+from random import Random
+from Target import place_target
+
+# "none" keeps the starting targets only, "waves" adds a wave of targets on a
+# timer or as soon as the field is cleared, "endless" brings every killed
+# target back after a delay
+SPAWN_MODES = ("none", "waves", "endless")
+
+
+# brings targets back into a running session. new targets reuse the rows of
+# killed ones, so endless sessions keep a store the size of the live count
+class TargetSpawner:
+    def __init__(
+        self,
+        targets,
+        mode="none",
+        seed=0,
+        amplitude_range=(3.0, 10.0),
+        frequency_range=(0.5, 2.0),
+        interval=5.0,
+        waves=0,
+        wave_size=None,
+        max_live=100,
+    ):
+        if mode not in SPAWN_MODES:
+            raise ValueError(f"unknown spawn mode {mode!r}")
+        self.targets = targets
+        self.mode = mode
+        # its own stream so the starting targets match the other modes
+        self.random = Random(f"spawn {seed}")
+        self.amplitude_range = amplitude_range
+        self.frequency_range = frequency_range
+        self.interval = interval  # seconds between waves or before a respawn
+        self.waves = waves  # waves in the session, 0 never stops
+        self.wave_size = wave_size or targets.live_count()
+        self.max_live = max_live
+
+        # the starting targets are the first wave
+        self.wave = 1
+        self.next_wave = interval
+        # endless mode: live targets plus queued respawns always add up to
+        # the starting count
+        self.target_count = targets.live_count()
+        self.respawns = []  # heap of respawn times
+
+        # stats
+        self.spawned = 0
+
+    def finished(self):
+        if self.mode == "none":
+            return self.targets.live_count() == 0
+        if self.mode == "waves":
+            return (
+                self.waves > 0
+                and self.wave >= self.waves
+                and self.targets.live_count() == 0
+            )
+        return False
+
+    def spawn(self):
+        index = self.targets.spawn()
+        place_target(
+            self.targets, index, self.random, self.amplitude_range, self.frequency_range
+        )
+        self.spawned += 1
+        return index
+
+    # spawns whatever is due at simulation time `now`, returns the new rows
+    def step(self, now):
+        if self.mode == "waves":
+            return self.step_waves(now)
+        if self.mode == "endless":
+            return self.step_endless(now)
+        return []
+
+    def step_waves(self, now):
+        live = self.targets.live_count()
+        if self.waves > 0 and self.wave >= self.waves:
+            return []
+        if live > 0 and now < self.next_wave:
+            return []
+        self.wave += 1
+        self.next_wave = now + self.interval
+        count = max(0, min(self.wave_size, self.max_live - live))
+        return [self.spawn() for _ in range(count)]
+
+    def step_endless(self, now):
+        # every target that died since the last tick gets a respawn time
+        killed = self.target_count - self.targets.live_count() - len(self.respawns)
+        for _ in range(killed):
+            heapq.heappush(self.respawns, now + self.interval)
+
+        spawned = []
+        while self.respawns and self.respawns[0] <= now:
+            heapq.heappop(self.respawns)
+            spawned.append(self.spawn())
+        return spawned
@@ -1,135 +1,269 @@
+import heapq
 import math
-import pygame
-import random
-from OpenGL.GL import *
-from OpenGL.GLU import GLU_SMOOTH, gluNewQuadric, gluCylinder, gluQuadricNormals
-
-
-def draw_hemisphere(radius, slices, stacks):
-    for i in range(stacks):
-        # start and end latitude
-        lat0 = (math.pi / 2) * (i / stacks)
-        lat1 = (math.pi / 2) * ((i + 1) / stacks)
-
-        z0 = math.sin(lat0)
-        zr0 = math.cos(lat0)
-
-        z1 = math.sin(lat1)
-        zr1 = math.cos(lat1)
-
-        glBegin(GL_QUAD_STRIP)
-        for j in range(slices + 1):
-            lng = 2 * math.pi * (j / slices)
-            x = math.cos(lng)
-            y = math.sin(lng)
-
-            # first vertex (lower latitude)
-            glNormal3f(x * zr0, y * zr0, z0)
-            glVertex3f(x * zr0 * radius, y * zr0 * radius, z0 * radius)
-
-            # second vertex (higher latitude)
-            glNormal3f(x * zr1, y * zr1, z1)
-            glVertex3f(x * zr1 * radius, y * zr1 * radius, z1 * radius)
-        glEnd()
-
-
-def draw_capsule(size, slices=16, stacks=16):
-    radius = size / 4.0
-    cylinder_height = size - 2 * radius
-
-    quadric = gluNewQuadric()
-    gluQuadricNormals(quadric, GLU_SMOOTH)
-
-    # draw the cylinder standing
-    glPushMatrix()
-    glRotatef(-90, 1, 0, 0)
-    gluCylinder(quadric, radius, radius, cylinder_height, slices, stacks)
-    glPopMatrix()
-
-    # draw the top hemisphere
-    glPushMatrix()
-    glRotatef(-90, 1, 0, 0)
-    glTranslatef(0.0, 0.0, cylinder_height)
-    draw_hemisphere(radius, slices, stacks)
-    glPopMatrix()
-
-    # draw the bottom hemisphere
-    glPushMatrix()
-    glRotatef(-90, 1, 0, 0)
-    glRotatef(180, 1, 0, 0)
-    draw_hemisphere(radius, slices, stacks)
-    glPopMatrix()
-
-
-def draw_targets(targets):
-    for target in targets:
-        if not target["hit"]:
-            glPushMatrix()
-            glColor(1, 0, 0)
-            glTranslatef(
-                target["position"].x, target["position"].y, target["position"].z
-            )
-            draw_capsule(target["size"])
-            glPopMatrix()
+from random import Random
+import numpy as np
 
 
-def update_targets(targets, delta_time):
-    for target in targets:
-        if target["hit"]:
-            continue
+# triangles in a capsule, the cylinder and both hemispheres are each a grid
+# of slices x stacks quads
+def capsule_triangles(slices, stacks):
+    return 6 * slices * stacks
 
-        # update elapsed time
-        target["elapsed_time"] += delta_time
 
-        # calculate new positions based on elapsed time
-        new_x = target["initial_x"] + target["amplitude_x"] * math.sin(
-            target["frequency_x"] * target["elapsed_time"] + target["phase_x"]
+# picks a capsule tessellation per target from its distance to the eye.
+# `distances` are the switch points between neighbouring levels, and a target
+# only changes level once it is `hysteresis` units past a switch point so it
+# does not flicker while moving along the boundary. with a triangle budget the
+# farthest targets are coarsened further until the frame fits
+class CapsuleLod:
+    def __init__(
+        self,
+        levels=((16, 16), (12, 8), (8, 4), (6, 2)),
+        distances=(12.0, 25.0, 45.0),
+        hysteresis=2.0,
+        triangle_budget=None,
+    ):
+        self.levels = list(levels)
+        self.distances = np.asarray(distances, dtype=np.float64)
+        self.hysteresis = hysteresis
+        self.triangle_budget = triangle_budget
+        self.level_triangles = np.array(
+            [capsule_triangles(*level) for level in self.levels]
         )
-        new_z = target["initial_z"] + target["amplitude_z"] * math.cos(
-            target["frequency_z"] * target["elapsed_time"] + target["phase_z"]
+
+        # level each target was last drawn at before the budget, -1 if unseen
+        self.current = np.full(0, -1, dtype=np.int64)
+        self.triangles = 0  # triangles selected in the last frame
+
+    # levels for the targets at `indices`, whose bounding spheres are centered
+    # at `centers`
+    def select(self, indices, centers, eye):
+        if len(self.current) <= (indices.max() if len(indices) else -1):
+            grown = np.full(indices.max() + 1, -1, dtype=np.int64)
+            grown[: len(self.current)] = self.current
+            self.current = grown
+
+        distance = np.linalg.norm(centers - np.asarray(eye, dtype=np.float64), axis=1)
+        nearest = np.searchsorted(self.distances, distance - self.hysteresis)
+        farthest = np.searchsorted(self.distances, distance + self.hysteresis)
+        current = self.current[indices]
+        levels = np.where(
+            current < 0,
+            np.searchsorted(self.distances, distance),
+            np.clip(current, nearest, farthest),
         )
+        self.current[indices] = levels
+
+        if self.triangle_budget is not None:
+            levels = self.fit_budget(levels, distance)
+        self.triangles = int(self.level_triangles[levels].sum())
+        return levels
+
+    # coarsens the farthest targets one level at a time until the total fits
+    def fit_budget(self, levels, distance):
+        levels = levels.copy()
+        coarsest = len(self.levels) - 1
+        farthest_first = np.argsort(-distance, kind="stable")
+        for _ in range(coarsest):
+            excess = self.level_triangles[levels].sum() - self.triangle_budget
+            if excess <= 0:
+                break
+            candidates = farthest_first[levels[farthest_first] < coarsest]
+            if len(candidates) == 0:
+                break
+            savings = (
+                self.level_triangles[levels[candidates]]
+                - self.level_triangles[levels[candidates] + 1]
+            )
+            count = int(np.searchsorted(np.cumsum(savings), excess)) + 1
+            levels[candidates[:count]] += 1
+        return levels
+
+
+# targets are rows of fixed columns. killed rows go on a free list and are
+# reused by spawn(), so the store only grows when more targets are alive at
+# once than ever before. the live rows are tracked as they are killed and
+# spawned, so counting and listing them never scans the dead ones
+class TargetStore:
+    def __init__(self, count):
+        # one row per target, x z pairs for the movement columns
+        self.position = np.zeros((count, 3))
+        self.previous_position = np.zeros((count, 3))  # position one tick ago
+        self.hitbox_position = np.zeros((count, 3))
+        self.size = np.full(count, 2.0)
+        self.initial = np.zeros((count, 2))
+        self.amplitude = np.zeros((count, 2))
+        self.frequency = np.zeros((count, 2))
+        self.phase = np.zeros((count, 2))
+        self.elapsed_time = np.zeros(count)
+        self.alive = np.ones(count, dtype=bool)
+        # moves along the closed form sines in update_targets, so the impact
+        # scheduler can solve when shots reach it
+        self.analytic = np.ones(count, dtype=bool)
+
+        # live rows packed at the front of live_slots, row -> place in it
+        self.live_slots = np.arange(count)
+        self.live_place = np.arange(count)
+        self.live = count
+        self.free = []  # heap of dead rows, the lowest is reused first
+        self.sorted_live = None  # live_indices() until the next kill or spawn
+
+        # optional spatial index kept in sync by update_targets
+        self.broadphase = None
+
+    def __len__(self):
+        return len(self.alive)
+
+    def live_count(self):
+        return self.live
+
+    # live rows in ascending order, shared until the next kill or spawn so
+    # do not modify it
+    def live_indices(self):
+        if self.sorted_live is None:
+            self.sorted_live = np.sort(self.live_slots[: self.live])
+        return self.sorted_live
+
+    def attach_broadphase(self, broadphase):
+        self.broadphase = broadphase
+        broadphase.update(self)
+
+    # positions blended between the last two ticks for smooth rendering
+    def render_positions(self, alpha, indices=None):
+        if indices is None:
+            indices = self.live_indices()
+        previous = self.previous_position[indices]
+        return previous + (self.position[indices] - previous) * alpha
+
+    def kill(self, index):
+        if not self.alive[index]:
+            return
+        self.alive[index] = False
+        # move the last live row into the hole
+        place = self.live_place[index]
+        last = self.live_slots[self.live - 1]
+        self.live_slots[place] = last
+        self.live_place[last] = place
+        self.live -= 1
+        heapq.heappush(self.free, int(index))
+        self.sorted_live = None
+
+    # returns a live row for a new target, reusing a dead one when there is
+    # one. the caller fills in its movement with place_target
+    def spawn(self):
+        if not self.free:
+            self.grow(max(len(self), 1))
+        index = heapq.heappop(self.free)
+        self.alive[index] = True
+        self.analytic[index] = True
+        self.elapsed_time[index] = 0.0
+        self.live_slots[self.live] = index
+        self.live_place[index] = self.live
+        self.live += 1
+        self.sorted_live = None
+        return index
+
+    # adds `extra` dead rows to every column
+    def grow(self, extra):
+        count = len(self)
+        for name in (
+            "position",
+            "previous_position",
+            "hitbox_position",
+            "initial",
+            "amplitude",
+            "frequency",
+            "phase",
+            "elapsed_time",
+        ):
+            column = getattr(self, name)
+            padding = np.zeros((extra,) + column.shape[1:])
+            setattr(self, name, np.concatenate([column, padding]))
+        self.size = np.concatenate([self.size, np.full(extra, 2.0)])
+        self.alive = np.concatenate([self.alive, np.zeros(extra, dtype=bool)])
+        self.analytic = np.concatenate([self.analytic, np.ones(extra, dtype=bool)])
+        self.live_slots = np.concatenate([self.live_slots, np.arange(extra) + count])
+        self.live_place = np.concatenate([self.live_place, np.arange(extra) + count])
+        for index in range(count, count + extra):
+            heapq.heappush(self.free, index)
+
+    # axis aligned hitboxes around the hitbox positions, narrower in x and z
+    def hitbox_bounds(self, hitbox_scale, indices=None):
+        if indices is None:
+            indices = self.live_indices()
+        half_size = (self.size[indices] / 2) * hitbox_scale
+        y_half_size = self.size[indices] / 2
+        half_extent = np.stack([half_size, y_half_size, half_size], axis=1)
+        centers = self.hitbox_position[indices]
+        return centers - half_extent, centers + half_extent
+
+
+# bounding sphere of each capsule drawn at `positions`, the capsule spans
+# from size / 4 below its position to 3 / 4 of its size above it
+def target_bounding_spheres(targets, positions, indices):
+    sizes = targets.size[indices]
+    centers = positions.copy()
+    centers[:, 1] += sizes / 4
+    return centers, sizes / 2
+
+
+def update_targets(targets, delta_time):
+    live = targets.live_indices()
+    targets.previous_position[live] = targets.position[live]
+
+    # update elapsed time
+    targets.elapsed_time[live] += delta_time
+
+    # calculate new positions based on elapsed time, x uses sin and z uses cos
+    angle = (
+        targets.frequency[live] * targets.elapsed_time[live, None] + targets.phase[live]
+    )
+    new_x = targets.initial[live, 0] + targets.amplitude[live, 0] * np.sin(angle[:, 0])
+    new_z = targets.initial[live, 1] + targets.amplitude[live, 1] * np.cos(angle[:, 1])
+
+    # update target and hitbox position
+    targets.position[live, 0] = new_x
+    targets.position[live, 2] = new_z
+    targets.hitbox_position[live, 0] = new_x
+    targets.hitbox_position[live, 2] = new_z
+
+    if targets.broadphase is not None:
+        targets.broadphase.update(targets)
+
+
+# area targets are placed in, inside the ground
+FIELD_MIN = -45
+FIELD_MAX = 45
+
+
+# gives row `index` a random start point and movement drawn from `rng`
+def place_target(targets, index, rng, amplitude_range, frequency_range):
+    initial_x = rng.uniform(FIELD_MIN, FIELD_MAX)
+    initial_z = rng.uniform(FIELD_MIN, FIELD_MAX)
+    y = -0.5  # capsule height is 1.0, so y = -0.5 centers it
+
+    # random movement for each axis (except y)
+    amplitude_x = rng.uniform(*amplitude_range)
+    amplitude_z = rng.uniform(*amplitude_range)
+    frequency_x = rng.uniform(*frequency_range)
+    frequency_z = rng.uniform(*frequency_range)
+    phase_x = rng.uniform(0, 2 * math.pi)
+    phase_z = rng.uniform(0, 2 * math.pi)
+
+    targets.position[index] = (initial_x, y, initial_z)
+    targets.previous_position[index] = targets.position[index]
+    targets.hitbox_position[index] = (initial_x, 0, initial_z)
+    targets.initial[index] = (initial_x, initial_z)
+    targets.amplitude[index] = (amplitude_x, amplitude_z)
+    targets.frequency[index] = (frequency_x, frequency_z)
+    targets.phase[index] = (phase_x, phase_z)
+
 
-        # update target and hitbox position
-        target["position"].x = new_x
-        target["position"].z = new_z
-        target["hitbox_position"].x = new_x
-        target["hitbox_position"].z = new_z
-
-
-def create_targets():
-    targets = []
-    num_targets = 10
-    field_min = -45
-    field_max = 45
-
-    for _ in range(num_targets):
-        initial_x = random.uniform(field_min, field_max)
-        initial_z = random.uniform(field_min, field_max)
-        y = -0.5  # capsule height is 1.0, so y = -0.5 centers it
-
-        # random movement for each axis (except y)
-        amplitude_x = random.uniform(3.0, 10.0)
-        amplitude_z = random.uniform(3.0, 10.0)
-        frequency_x = random.uniform(0.5, 2.0)
-        frequency_z = random.uniform(0.5, 2.0)
-        phase_x = random.uniform(0, 2 * math.pi)
-        phase_z = random.uniform(0, 2 * math.pi)
-
-        # target properties (dictionary)
-        target = {
-            "position": pygame.math.Vector3(initial_x, y, initial_z),
-            "hitbox_position": pygame.math.Vector3(initial_x, 0, initial_z),
-            "hit": False,
-            "size": 2.0,
-            "initial_x": initial_x,
-            "initial_z": initial_z,
-            "amplitude_x": amplitude_x,
-            "amplitude_z": amplitude_z,
-            "frequency_x": frequency_x,
-            "frequency_z": frequency_z,
-            "phase_x": phase_x,
-            "phase_z": phase_z,
-            "elapsed_time": 0.0,
-        }
-        targets.append(target)
+def create_targets(
+    num_targets=10, seed=None, amplitude_range=(3.0, 10.0), frequency_range=(0.5, 2.0)
+):
+    targets = TargetStore(num_targets)
+    rng = Random(seed)
+    for i in range(num_targets):
+        place_target(targets, i, rng, amplitude_range, frequency_range)
     return targets
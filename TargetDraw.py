@@ -0,0 +1,77 @@
+import numpy as np
+from OpenGL.GL import *
+from Geometry import build_capsule
+from Mesh import Mesh
+from Frustum import spheres_visible
+from Transform import gl_matrix, translate_batch
+from Target import target_bounding_spheres
+
+# capsule meshes depend only on size and tessellation, so each one is built
+# once and shared by every target
+capsule_meshes = {}
+
+
+def capsule_mesh(size, slices=16, stacks=16):
+    key = (size, slices, stacks)
+    mesh = capsule_meshes.get(key)
+    if mesh is None:
+        radius = size / 4.0
+        cylinder_height = size - 2 * radius
+        vertices, normals, triangles = build_capsule(
+            radius, cylinder_height, slices, stacks
+        )
+        mesh = Mesh(vertices, triangles, GL_TRIANGLES, normals)
+        capsule_meshes[key] = mesh
+    return mesh
+
+
+# frees the gpu buffers of every cached capsule
+def release_capsule_meshes():
+    for mesh in capsule_meshes.values():
+        mesh.release()
+    capsule_meshes.clear()
+
+
+def draw_capsule(size, slices=16, stacks=16):
+    capsule_mesh(size, slices, stacks).draw()
+
+
+# draws the live targets, skipping those outside the view frustum when
+# `planes` is given and picking a tessellation per target when `lod` and the
+# eye position are given. with the camera's `view` matrix every target's
+# modelview matrix is computed up front and loaded with one call. returns
+# how many were culled
+def draw_targets(targets, alpha=1.0, planes=None, lod=None, eye=None, view=None):
+    indices = targets.live_indices()
+    positions = targets.render_positions(alpha, indices)
+    centers, radii = target_bounding_spheres(targets, positions, indices)
+    culled = 0
+    if planes is not None:
+        visible = spheres_visible(planes, centers, radii)
+        culled = len(indices) - int(np.count_nonzero(visible))
+        indices = indices[visible]
+        positions = positions[visible]
+        centers = centers[visible]
+
+    if lod is not None and eye is not None:
+        tessellation = [
+            lod.levels[level] for level in lod.select(indices, centers, eye)
+        ]
+    else:
+        tessellation = [(16, 16)] * len(indices)
+
+    glColor(1, 0, 0)
+    if view is not None:
+        matrices = gl_matrix(translate_batch(view, positions))
+        for i, matrix, (slices, stacks) in zip(indices, matrices, tessellation):
+            glLoadMatrixf(matrix)
+            draw_capsule(targets.size[i], slices, stacks)
+        glLoadMatrixf(gl_matrix(view))
+        return culled
+
+    for i, position, (slices, stacks) in zip(indices, positions, tessellation):
+        glPushMatrix()
+        glTranslatef(*position)
+        draw_capsule(targets.size[i], slices, stacks)
+        glPopMatrix()
+    return culled
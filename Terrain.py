@@ -0,0 +1,243 @@
+import math
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from OpenGL.GL import *
+from Geometry import grid_indices
+from Mesh import Mesh
+from Frustum import spheres_visible
+
+# the ground texture repeats every 2 units like the original 100 unit quad
+TEXTURE_SCALE = 0.5
+
+
+# vertices, normals, texture coordinates and indices of one chunk, a grid of
+# resolution x resolution quads plus a skirt hanging down from its edges that
+# hides the cracks between neighbouring chunks of different detail
+def build_chunk(height_field, chunk_x, chunk_z, chunk_size, resolution, skirt=4.0):
+    spacing = chunk_size / resolution
+    # one extra sample on each side for the normals
+    steps = np.arange(-1, resolution + 2) * spacing
+    xs = chunk_x * chunk_size + steps
+    zs = chunk_z * chunk_size + steps
+    x, z = np.meshgrid(xs, zs, indexing="xy")
+    heights = height_field.heights(x, z)
+
+    dx = (heights[1:-1, 2:] - heights[1:-1, :-2]) / (2 * spacing)
+    dz = (heights[2:, 1:-1] - heights[:-2, 1:-1]) / (2 * spacing)
+    normals = np.stack([-dx, np.ones_like(dx), -dz], axis=-1).reshape(-1, 3)
+    normals /= np.linalg.norm(normals, axis=1)[:, None]
+
+    vertices = np.stack(
+        [x[1:-1, 1:-1], heights[1:-1, 1:-1], z[1:-1, 1:-1]], axis=-1
+    ).reshape(-1, 3)
+    indices = [grid_indices(resolution, resolution)]
+
+    # skirt vertices below each edge, walked in order around the chunk
+    side = resolution + 1
+    grid = np.arange(side * side).reshape(side, side)
+    edge = np.concatenate(
+        [grid[0, :-1], grid[:-1, -1], grid[-1, :0:-1], grid[:0:-1, 0], grid[:1, 0]]
+    )
+    skirt_vertices = vertices[edge].copy()
+    skirt_vertices[:, 1] -= skirt
+    first = len(vertices)
+    top = edge[:-1]
+    next_top = edge[1:]
+    bottom = first + np.arange(len(edge) - 1)
+    next_bottom = bottom + 1
+    indices.append(
+        np.stack([top, bottom, next_top, next_top, bottom, next_bottom], axis=1)
+        .reshape(-1)
+        .astype(np.uint32)
+    )
+
+    vertices = np.concatenate([vertices, skirt_vertices])
+    normals = np.concatenate([normals, normals[edge]])
+    texcoords = vertices[:, [0, 2]] * TEXTURE_SCALE
+    return (
+        vertices.astype(np.float32),
+        normals.astype(np.float32),
+        texcoords.astype(np.float32),
+        np.concatenate(indices),
+    )
+
+
+# keeps the chunks around the eye resident. chunk meshes are built on worker
+# threads and only uploaded on the main thread, a few per frame so streaming
+# never stalls a frame. chunks further away use fewer quads, and chunks that
+# fell out of view are kept in a least recently used cache until it is full
+class TerrainStreamer:
+    def __init__(
+        self,
+        height_field,
+        chunk_size=64.0,
+        view_distance=300.0,
+        resolutions=(32, 16, 8, 4),
+        lod_distance=64.0,
+        cache_chunks=None,
+        uploads_per_frame=4,
+        workers=2,
+        max_pending=None,
+    ):
+        self.height_field = height_field
+        self.chunk_size = chunk_size
+        self.view_distance = view_distance
+        self.resolutions = list(resolutions)
+        self.lod_distance = lod_distance  # distance covered by each detail level
+        self.uploads_per_frame = uploads_per_frame
+        # builds in flight, kept short so the queue follows the camera and
+        # the workers do not starve the main thread of the interpreter lock
+        self.max_pending = max_pending or workers * 2
+        if cache_chunks is None:
+            # room for everything in view plus a ring of recently left chunks
+            radius = view_distance / chunk_size + 2
+            cache_chunks = int(math.pi * radius * radius * 1.5)
+        self.cache_chunks = cache_chunks
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="terrain"
+        )
+        self.resident = OrderedDict()  # (x, z, level) -> mesh, oldest first
+        self.bounds = {}  # (x, z, level) -> (center, radius)
+        self.pending = {}  # (x, z, level) -> future
+        self.visible = []  # keys in view distance this frame
+
+        # stats
+        self.drawn = 0
+        self.triangles = 0
+        self.evicted = 0
+
+    def level_for(self, distance):
+        level = (distance // self.lod_distance).astype(np.int64)
+        return np.minimum(level, len(self.resolutions) - 1)
+
+    # chunks within the view distance of the eye and the level each one wants
+    def wanted_chunks(self, eye):
+        size = self.chunk_size
+        reach = int(math.ceil(self.view_distance / size))
+        center_x = int(math.floor(eye[0] / size))
+        center_z = int(math.floor(eye[2] / size))
+        offsets = np.arange(-reach, reach + 1)
+        grid_x, grid_z = np.meshgrid(center_x + offsets, center_z + offsets)
+        grid_x = grid_x.ravel()
+        grid_z = grid_z.ravel()
+
+        # distance from the eye to the nearest point of each chunk
+        near_x = np.clip(eye[0], grid_x * size, (grid_x + 1) * size)
+        near_z = np.clip(eye[2], grid_z * size, (grid_z + 1) * size)
+        distance = np.hypot(near_x - eye[0], near_z - eye[2])
+        inside = distance <= self.view_distance
+        order = np.argsort(distance[inside], kind="stable")
+        return (
+            grid_x[inside][order],
+            grid_z[inside][order],
+            self.level_for(distance[inside][order]),
+        )
+
+    def build(self, key):
+        chunk_x, chunk_z, level = key
+        return build_chunk(
+            self.height_field,
+            chunk_x,
+            chunk_z,
+            self.chunk_size,
+            self.resolutions[level],
+        )
+
+    # queues missing chunks nearest first, uploads finished ones and picks
+    # the mesh to draw for every wanted chunk. a chunk whose wanted level is
+    # not built yet keeps drawing whatever level is resident meanwhile
+    def update(self, eye):
+        eye = (float(eye[0]), float(eye[1]), float(eye[2]))
+        chunks_x, chunks_z, levels = self.wanted_chunks(eye)
+        wanted = [
+            (int(x), int(z), int(level))
+            for x, z, level in zip(chunks_x, chunks_z, levels)
+        ]
+        wanted_keys = set(wanted)
+
+        # the camera moved on before these were started
+        for key, future in list(self.pending.items()):
+            if key not in wanted_keys and future.cancel():
+                del self.pending[key]
+        for key in wanted:
+            if len(self.pending) >= self.max_pending:
+                break
+            if key not in self.resident and key not in self.pending:
+                self.pending[key] = self.executor.submit(self.build, key)
+
+        self.upload_finished(wanted_keys)
+
+        self.visible = []
+        for key in wanted:
+            if key not in self.resident:
+                key = self.fallback(key)
+                if key is None:
+                    continue
+            self.resident.move_to_end(key)
+            self.visible.append(key)
+        self.evict()
+
+    def upload_finished(self, wanted):
+        uploads = 0
+        for key, future in list(self.pending.items()):
+            if uploads == self.uploads_per_frame:
+                break
+            if not future.done():
+                continue
+            del self.pending[key]
+            if key not in wanted:
+                continue
+            vertices, normals, texcoords, indices = future.result()
+            mesh = Mesh(vertices, indices, GL_TRIANGLES, normals, texcoords)
+            mesh.upload()
+            self.resident[key] = mesh
+            low = vertices.min(axis=0)
+            high = vertices.max(axis=0)
+            self.bounds[key] = ((low + high) / 2, float(np.linalg.norm(high - low) / 2))
+            uploads += 1
+
+    # nearest level of the chunk that is already resident, finer first
+    def fallback(self, key):
+        chunk_x, chunk_z, level = key
+        for offset in range(1, len(self.resolutions)):
+            for candidate in (level - offset, level + offset):
+                if 0 <= candidate < len(self.resolutions):
+                    if (chunk_x, chunk_z, candidate) in self.resident:
+                        return (chunk_x, chunk_z, candidate)
+        return None
+
+    # frees the least recently drawn chunks once the cache is over capacity
+    def evict(self):
+        while len(self.resident) > self.cache_chunks:
+            key, mesh = self.resident.popitem(last=False)
+            mesh.release()
+            del self.bounds[key]
+            self.evicted += 1
+
+    # draws with whatever texture is bound, returns how many chunks were culled
+    def draw(self, planes=None):
+        keys = self.visible
+        if planes is not None and keys:
+            centers = np.array([self.bounds[key][0] for key in keys])
+            radii = np.array([self.bounds[key][1] for key in keys])
+            visible = spheres_visible(planes, centers, radii)
+            keys = [key for key, keep in zip(keys, visible) if keep]
+
+        glColor(1, 1, 1)
+        triangles = 0
+        for key in keys:
+            mesh = self.resident[key]
+            mesh.draw()
+            triangles += len(mesh.index_array) // 3
+        self.drawn = len(keys)
+        self.triangles = triangles
+        return len(self.visible) - len(keys)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        for mesh in self.resident.values():
+            mesh.release()
+        self.resident.clear()
+        self.bounds.clear()
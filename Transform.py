@@ -0,0 +1,74 @@
+import math
+import numpy as np
+
+# 4x4 matrices in the usual math layout, column vectors and translation in
+# the last column. gl expects column major order, see `gl_matrix`
+
+
+def identity():
+    return np.eye(4)
+
+
+def translation(x, y, z):
+    matrix = np.eye(4)
+    matrix[:3, 3] = (x, y, z)
+    return matrix
+
+
+# same convention as glRotatef, angle in degrees around the given axis
+def rotation(angle, x, y, z):
+    axis = np.array([x, y, z], dtype=np.float64)
+    axis /= np.linalg.norm(axis)
+    x, y, z = axis
+    c = math.cos(math.radians(angle))
+    s = math.sin(math.radians(angle))
+    t = 1 - c
+    matrix = np.eye(4)
+    matrix[:3, :3] = [
+        [t * x * x + c, t * x * y - s * z, t * x * z + s * y],
+        [t * x * y + s * z, t * y * y + c, t * y * z - s * x],
+        [t * x * z - s * y, t * y * z + s * x, t * z * z + c],
+    ]
+    return matrix
+
+
+# same matrix as gluLookAt
+def look_at(eye, target, up):
+    eye = np.asarray(eye, dtype=np.float64)
+    forward = np.asarray(target, dtype=np.float64) - eye
+    forward /= np.linalg.norm(forward)
+    side = np.cross(forward, np.asarray(up, dtype=np.float64))
+    side /= np.linalg.norm(side)
+    true_up = np.cross(side, forward)
+
+    matrix = np.eye(4)
+    matrix[0, :3] = side
+    matrix[1, :3] = true_up
+    matrix[2, :3] = -forward
+    matrix[:3, 3] = -matrix[:3, :3] @ eye
+    return matrix
+
+
+# same matrix as gluPerspective, fov is vertical and in degrees
+def perspective(fov, aspect, near, far):
+    f = 1 / math.tan(math.radians(fov) / 2)
+    matrix = np.zeros((4, 4))
+    matrix[0, 0] = f / aspect
+    matrix[1, 1] = f
+    matrix[2, 2] = (far + near) / (near - far)
+    matrix[2, 3] = 2 * far * near / (near - far)
+    matrix[3, 2] = -1
+    return matrix
+
+
+# `matrix` times a translation to each position, for every position at once
+def translate_batch(matrix, positions):
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    matrices = np.repeat(matrix[None], len(positions), axis=0)
+    matrices[:, :3, 3] = positions @ matrix[:3, :3].T + matrix[:3, 3]
+    return matrices
+
+
+# float32 column major copy for glLoadMatrixf, works on one matrix or a stack
+def gl_matrix(matrix):
+    return np.ascontiguousarray(np.swapaxes(matrix, -1, -2), dtype=np.float32)
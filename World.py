@@ -1,10 +1,9 @@
 from OpenGL.GL import *
 
 
-def draw_ground(terrain_texture_id):
-    glEnable(GL_TEXTURE_2D)
-    glBindTexture(GL_TEXTURE_2D, terrain_texture_id)
-
+# draws with whatever texture is bound, the render queue binds the terrain
+# texture before calling it
+def draw_ground():
     # repeat the texture 50 times on the ground
     repeat_factor = 50
 
@@ -21,4 +20,3 @@ def draw_ground(terrain_texture_id):
     glVertex3f(-50, -1, 50)
     glEnd()
     glPopMatrix()
-    glDisable(GL_TEXTURE_2D)
@@ -0,0 +1,74 @@
+# compares bullet query cost with and without the uniform grid broadphase
+# as the number of targets grows
+#
+#   python benchmarks/bench_broadphase.py [--bullets 64] [--repeat 20]
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Target import create_targets, update_targets
+from Bullet import find_hits
+from Broadphase import UniformGrid
+
+TARGET_COUNTS = [100, 1000, 5000, 10000, 20000]
+HITBOX_SCALE = 0.5
+BULLET_STEP = 150.0 / 60.0  # distance a bullet travels in one 60hz frame
+
+
+def random_segments(rng, count):
+    starts = rng.uniform(-45, 45, (count, 3))
+    starts[:, 1] = rng.uniform(-1, 1, count)
+    direction = rng.normal(size=(count, 3))
+    direction /= np.linalg.norm(direction, axis=1)[:, None]
+    return starts, starts + direction * BULLET_STEP
+
+
+def best_time(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bullets", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--cell-size", type=float, default=4.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    starts, ends = random_segments(rng, args.bullets)
+
+    print(f"{args.bullets} bullets, best of {args.repeat}")
+    print(
+        f"{'targets':>8} {'brute ms':>10} {'grid ms':>10} {'update ms':>10} {'speedup':>8}"
+    )
+    for count in TARGET_COUNTS:
+        targets = create_targets(count, seed=0)
+        grid = UniformGrid(-60, 60, -60, 60, args.cell_size)
+        targets.attach_broadphase(grid)
+
+        brute = best_time(
+            lambda: find_hits(targets, starts, ends, HITBOX_SCALE), args.repeat
+        )
+        gridded = best_time(
+            lambda: find_hits(targets, starts, ends, HITBOX_SCALE, grid), args.repeat
+        )
+        # one frame of movement followed by the incremental grid update
+        update = best_time(lambda: update_targets(targets, 1.0 / 60.0), args.repeat)
+
+        print(
+            f"{count:>8} {brute * 1000:>10.3f} {gridded * 1000:>10.3f} "
+            f"{update * 1000:>10.3f} {brute / gridded:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+# benchmark suite for the simulation hot paths, results are written as json
+# so runs from different commits can be compared
+#
+#   python benchmarks/run_benchmarks.py --output bench.json [--quick] [--filter update]
+#   python benchmarks/run_benchmarks.py --compare old.json new.json
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from Target import create_targets, update_targets
+from Bullet import BulletPool, check_hits_continuous, find_hits, line_aabb_intersection
+from Broadphase import UniformGrid
+from ObjParser import load_obj_cached, parse_obj, parse_obj_lines
+from Input import SyntheticInput
+from Simulation import Simulation
+
+# GL_TRIANGLES, kept as a plain value so OpenGL is only imported when a gl
+# mesh is benchmarked
+TRIANGLES = 0x0004
+
+HITBOX_SCALE = 0.5
+DELTA_TIME = 1.0 / 60.0
+MAX_BRUTE_PAIRS = 2_000_000
+
+# parameter sweeps, the quick set is for a fast sanity run
+SWEEPS = {
+    "full": {
+        "targets": [10, 100, 1000, 10000],
+        "bullets": [1, 16, 128, 1024],
+        "faces": [1000, 10000, 100000],
+        "scalar_targets": [10, 100, 1000],
+    },
+    "quick": {
+        "targets": [10, 1000],
+        "bullets": [1, 128],
+        "faces": [1000, 10000],
+        "scalar_targets": [10, 100],
+    },
+}
+
+
+# a bullet shape that check_hits_continuous accepts
+class Segment:
+    def __init__(self, previous_position, position):
+        self.previous_position = previous_position
+        self.position = position
+
+
+# runs `function` in batches sized to take roughly `min_time` and returns
+# per call statistics in seconds
+def measure(function, repeat, min_time=0.05):
+    function()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        samples.append((time.perf_counter() - start) / number)
+
+    return {
+        "number": number,
+        "repeat": repeat,
+        "best_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.fmean(samples),
+    }
+
+
+# bullet segments one frame long, flying above every hitbox so repeated runs
+# never change the target state
+def missing_segments(count, seed=0):
+    rng = np.random.default_rng(seed)
+    starts = rng.uniform(-45, 45, (count, 3))
+    starts[:, 1] = 5.0
+    direction = rng.normal(size=(count, 3))
+    direction[:, 1] = 0
+    direction /= np.linalg.norm(direction, axis=1)[:, None]
+    return starts, starts + direction * 150.0 * DELTA_TIME
+
+
+# square grid of quads, roughly `faces` faces
+def write_grid_obj(path, faces):
+    side = max(1, int(faces**0.5))
+    with open(path, "w") as fp:
+        for z in range(side + 1):
+            for x in range(side + 1):
+                fp.write(f"v {x * 0.1:.6f} {((x * z) % 7) * 0.01:.6f} {z * 0.1:.6f}\n")
+        for z in range(side):
+            for x in range(side):
+                a = z * (side + 1) + x + 1
+                b = a + side + 1
+                fp.write(f"f {a}/1/1 {a + 1}/1/1 {b + 1}/1/1 {b}/1/1\n")
+
+
+# LoadMesh, or None when there is no usable gl library. pyopengl fails on
+# import with an AttributeError when its platform library cannot be loaded
+def gl_mesh_class():
+    try:
+        from LoadMesh import LoadMesh
+    except (ImportError, AttributeError):
+        return None
+    return LoadMesh
+
+
+def bench_update_targets(sweep):
+    for count in sweep["targets"]:
+        targets = create_targets(count, seed=0)
+        params = {"targets": count}
+        yield "update_targets", params, lambda: update_targets(targets, DELTA_TIME)
+
+        targets.attach_broadphase(UniformGrid(-60, 60, -60, 60))
+        yield "update_targets_with_grid", params, lambda: update_targets(
+            targets, DELTA_TIME
+        )
+
+        # a long session where most rows are dead, only live ones cost time
+        sparse = create_targets(count, seed=0)
+        for index in range(count - max(1, count // 10)):
+            sparse.kill(index)
+        yield "update_targets_mostly_dead", params, lambda: update_targets(
+            sparse, DELTA_TIME
+        )
+
+
+def bench_collision(sweep):
+    # one segment against one box, independent of the target count
+    starts, ends = missing_segments(1)
+    box_min, box_max = create_targets(1, seed=0).hitbox_bounds(HITBOX_SCALE, [0])
+    yield "line_aabb_intersection", {"targets": 1}, lambda: line_aabb_intersection(
+        starts[0], ends[0], box_min[0], box_max[0]
+    )
+
+    for count in sweep["scalar_targets"]:
+        targets = create_targets(count, seed=0)
+        segment = Segment(starts[0], ends[0])
+        yield "check_hits_continuous", {"targets": count, "bullets": 1}, lambda: (
+            check_hits_continuous(targets, segment, HITBOX_SCALE)
+        )
+
+    for count in sweep["targets"]:
+        targets = create_targets(count, seed=0)
+        grid = UniformGrid(-60, 60, -60, 60)
+        targets.attach_broadphase(grid)
+        for bullets in sweep["bullets"]:
+            starts, ends = missing_segments(bullets)
+            params = {"targets": count, "bullets": bullets}
+            # the all pairs test allocates bullets x targets tables, skip the huge ones
+            if bullets * count <= MAX_BRUTE_PAIRS:
+                yield "find_hits", params, lambda: find_hits(
+                    targets, starts, ends, HITBOX_SCALE
+                )
+            yield "find_hits_grid", params, lambda: find_hits(
+                targets, starts, ends, HITBOX_SCALE, grid
+            )
+
+
+def bench_bullet_update(sweep):
+    for count in sweep["bullets"]:
+        pool = BulletPool(capacity=count)
+        starts, ends = missing_segments(count)
+        for start, end in zip(starts, ends):
+            pool.spawn(start, end - start)
+        yield "bullet_pool_update", {"bullets": count}, lambda: pool.update(DELTA_TIME)
+
+
+def bench_mesh_parsing(sweep):
+    with tempfile.TemporaryDirectory() as directory:
+        for faces in sweep["faces"]:
+            path = os.path.join(directory, f"grid_{faces}.obj")
+            write_grid_obj(path, faces)
+            params = {"faces": faces}
+
+            yield "mesh_parse_legacy", params, lambda: parse_obj_lines(path)
+            yield "mesh_parse", params, lambda: parse_obj(path)
+
+            load_obj_cached(path)  # writes the cache
+            yield "mesh_read_cache", params, lambda: load_obj_cached(path)
+
+            # the full mesh with its vertex arrays, on machines with gl
+            mesh_class = gl_mesh_class()
+            if mesh_class is not None:
+                yield "mesh_load_cached", params, lambda: mesh_class(path, TRIANGLES)
+
+
+def bench_frame_step(sweep):
+    for count in sweep["targets"]:
+        simulation = Simulation(num_targets=count, seed=0)
+        input_source = SyntheticInput(0)
+        yield "simulation_step", {"targets": count}, lambda: simulation.step(
+            DELTA_TIME, input_source.next_frame(simulation)
+        )
+
+        # same session with impacts solved when shots are fired
+        scheduled = Simulation(num_targets=count, seed=0, collision="scheduled")
+        scheduled_input = SyntheticInput(0)
+        yield "simulation_step_scheduled", {"targets": count}, lambda: scheduled.step(
+            DELTA_TIME, scheduled_input.next_frame(scheduled)
+        )
+
+
+BENCHMARKS = [
+    bench_update_targets,
+    bench_collision,
+    bench_bullet_update,
+    bench_mesh_parsing,
+    bench_frame_step,
+]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    sweep = SWEEPS["quick" if args.quick else "full"]
+    results = []
+    for benchmark in BENCHMARKS:
+        for name, params, function in benchmark(sweep):
+            if args.filter and args.filter not in name:
+                continue
+            stats = measure(function, args.repeat)
+            results.append({"name": name, "params": params, **stats})
+            print(
+                f"{name:<28} {json.dumps(params):<36} {stats['median_s'] * 1e6:>12.2f} us"
+            )
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "sweep": "quick" if args.quick else "full",
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(report, fp, indent=2)
+
+
+# prints the median ratio new / old for every benchmark present in both files
+def compare(old_path, new_path):
+    with open(old_path) as fp:
+        old = json.load(fp)
+    with open(new_path) as fp:
+        new = json.load(fp)
+
+    def key(result):
+        return result["name"], json.dumps(result["params"], sort_keys=True)
+
+    baseline = {key(result): result for result in old["results"]}
+    for result in new["results"]:
+        before = baseline.get(key(result))
+        if before is None:
+            continue
+        ratio = result["median_s"] / before["median_s"]
+        print(f"{result['name']:<28} {key(result)[1]:<36} {ratio:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", help="write the results to this json file")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="smaller parameter sweeps")
+    parser.add_argument(
+        "--filter", help="only keep benchmarks whose name contains this"
+    )
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
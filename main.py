@@ -1,17 +1,40 @@
+import time
+
+# taken before the other imports so the startup report can time them
+startup_start = time.perf_counter()
+
+import sys
+from GLCalls import GLCallCounter, configure_fast_gl, fast_gl_requested
+
+# pyopengl reads its flags on the first OpenGL import, so the fast mode has to
+# be set up before any of the imports below
+if fast_gl_requested(sys.argv):
+    configure_fast_gl()
+
+import argparse
 import pygame
 from pygame.locals import *
 from OpenGL.GL import *
 from OpenGL.GLU import *
-from Camera import *
-from Target import draw_targets, update_targets, create_targets
+from Target import CapsuleLod
+from TargetDraw import draw_targets, release_capsule_meshes
 from Crosshair import draw_crosshair
-from LoadTexture import load_texture
+from LoadTexture import load_texture, load_texture_data, upload_texture
 from World import draw_ground
-from Bullet import check_hits_continuous, shoot_bullet
-from LoadMesh import LoadMesh
+from Terrain import TerrainStreamer
+from BulletDraw import draw_tracers
+from LoadMesh import LoadMesh, load_obj_cached
 from Lighting import Light
-
-pygame.init()
+from Input import ScriptedInput, read_pygame_input
+from Simulation import COLLISION_MODES, Simulation
+from Spawner import SPAWN_MODES
+from Replay import InputRecorder, load_recording, verify
+from Profiler import FrameProfiler
+from Overlay import draw_profiler_overlay
+from DebugDraw import DebugDraw
+from RenderQueue import SCREEN, RenderQueue
+from AssetManager import AssetManager, StartupTimer
+from Transform import gl_matrix
 
 # project settings
 screen_width = 800
@@ -20,28 +43,41 @@ background_color = (0.53, 0.81, 0.92, 1.0)
 drawing_color = (1, 1, 1, 1)
 terrain_texture_id = None
 hitbox_scale = 0.5
-gun_mesh = LoadMesh("Gun.obj", GL_TRIANGLES)
 
-# boundary limits
-GROUND_MIN_X = -49.0
-GROUND_MAX_X = 49.0
-GROUND_MIN_Z = -49.0
-GROUND_MAX_Z = 49.0
+# modules whose gl calls --count-gl counts, besides this one
+GL_MODULES = [
+    "TargetDraw",
+    "BulletDraw",
+    "Mesh",
+    "World",
+    "Terrain",
+    "DebugDraw",
+    "RenderQueue",
+    "Overlay",
+    "LoadTexture",
+    "Lighting",
+]
 
-screen = pygame.display.set_mode((screen_width, screen_height), DOUBLEBUF | OPENGL)
-pygame.display.set_caption("Simple 3D Shooter")
+# created in main() so importing this module does not open a window
+screen = None
+camera = None
 
-# camera init with boundary constraints
-camera = Camera(
-    ground_min_x=GROUND_MIN_X,
-    ground_max_x=GROUND_MAX_X,
-    ground_min_z=GROUND_MIN_Z,
-    ground_max_z=GROUND_MAX_Z,
-)
-camera.attach_gun(gun_mesh)  # attach gun mesh to camera
+# debug lines of the current frame, drawn in one batch per layer
+debug_draw = DebugDraw()
 
+# draws of a frame, sorted by gl state before they run
+render_queue = RenderQueue()
 
-def initialise():
+# capsule tessellation per target by distance from the camera
+target_lod = CapsuleLod()
+
+# streamed chunks around the camera, None draws the flat ground quad
+terrain = None
+
+
+# terrain_texture is an already uploaded texture id, the texture is loaded
+# here when it is not given
+def initialise(terrain_texture=None):
     global terrain_texture_id
     glClearColor(*background_color)
     glColor(*drawing_color)
@@ -49,13 +85,16 @@ def initialise():
 
     glMatrixMode(GL_PROJECTION)
     glLoadIdentity()
-    gluPerspective(60, (screen_width / screen_height), 0.1, 500.0)
+    camera.set_projection(60, (screen_width / screen_height), 0.1, camera.far)
+    glLoadMatrixf(gl_matrix(camera.projection_matrix()))
 
     # enable lighting
     Light()
 
     # load terrain texture
-    terrain_texture_id = load_texture("terrain_texture.jpeg")
+    if terrain_texture is None:
+        terrain_texture = load_texture("terrain_texture.jpeg")
+    terrain_texture_id = terrain_texture
 
 
 def init_camera():
@@ -64,103 +103,267 @@ def init_camera():
     glViewport(0, 0, screen.get_width(), screen.get_height())
 
 
-# function to draw hitbox for targets
-def draw_hitbox(box_min, box_max):
-    glDisable(GL_LIGHTING)
-    glColor3f(0, 1, 0)
-
-    glBegin(GL_LINES)
-    # bottom
-    glVertex3f(box_min.x, box_min.y, box_min.z)
-    glVertex3f(box_max.x, box_min.y, box_min.z)
-
-    glVertex3f(box_max.x, box_min.y, box_min.z)
-    glVertex3f(box_max.x, box_min.y, box_max.z)
-
-    glVertex3f(box_max.x, box_min.y, box_max.z)
-    glVertex3f(box_min.x, box_min.y, box_max.z)
-
-    glVertex3f(box_min.x, box_min.y, box_max.z)
-    glVertex3f(box_min.x, box_min.y, box_min.z)
-
-    # top
-    glVertex3f(box_min.x, box_max.y, box_min.z)
-    glVertex3f(box_max.x, box_max.y, box_min.z)
-
-    glVertex3f(box_max.x, box_max.y, box_min.z)
-    glVertex3f(box_max.x, box_max.y, box_max.z)
-
-    glVertex3f(box_max.x, box_max.y, box_max.z)
-    glVertex3f(box_min.x, box_max.y, box_max.z)
-
-    glVertex3f(box_min.x, box_max.y, box_max.z)
-    glVertex3f(box_min.x, box_max.y, box_min.z)
-
-    # vertical
-    glVertex3f(box_min.x, box_min.y, box_min.z)
-    glVertex3f(box_min.x, box_max.y, box_min.z)
-
-    glVertex3f(box_max.x, box_min.y, box_min.z)
-    glVertex3f(box_max.x, box_max.y, box_min.z)
+# the gun follows the camera, drawn with its own modelview matrix
+def draw_gun():
+    if camera.gun_mesh:
+        glPushMatrix()
+        glLoadMatrixf(gl_matrix(camera.view_matrix() @ camera.gun_matrix()))
+        camera.gun_mesh.draw()
+        glPopMatrix()
 
-    glVertex3f(box_max.x, box_min.y, box_max.z)
-    glVertex3f(box_max.x, box_max.y, box_max.z)
 
-    glVertex3f(box_min.x, box_min.y, box_max.z)
-    glVertex3f(box_min.x, box_max.y, box_max.z)
-    glEnd()
-
-    glEnable(GL_LIGHTING)
-
-
-def display(targets, bullets, show_hitboxes):
+# draws one frame through the render queue, with the profiler overlay when
+# `profiler` is given. returns how many objects were culled
+def display(targets, bullets, show_hitboxes, alpha=1.0, profiler=None):
     glClear(int(GL_COLOR_BUFFER_BIT) | int(GL_DEPTH_BUFFER_BIT))
     init_camera()
-    camera.apply()
-    camera.draw_gun()
-    draw_ground(terrain_texture_id)
-    draw_targets(targets)
-
-    for bullet in bullets:
-        bullet.draw()
+    glLoadMatrixf(gl_matrix(camera.view_matrix()))
+    width = screen.get_width()
+    height = screen.get_height()
+
+    # objects outside the view are dropped before any gl calls, the draws
+    # that cull return how many they dropped
+    planes = camera.frustum_planes()
+    render_queue.submit(draw_gun)
+    if terrain is None:
+        render_queue.submit(draw_ground, texture=terrain_texture_id, primitive=GL_QUADS)
+    else:
+        terrain.update(camera.render_eye)
+        render_queue.submit(terrain.draw, planes, texture=terrain_texture_id)
+    render_queue.submit(
+        draw_targets,
+        targets,
+        alpha,
+        planes,
+        target_lod,
+        camera.render_eye,
+        camera.view_matrix(),
+    )
+    render_queue.submit(
+        draw_tracers,
+        bullets.render_positions(alpha),
+        bullets.directions(),
+        bullets.size,
+        planes,
+        lighting=False,
+    )
 
     # render hitboxes if turned on
     if show_hitboxes:
-        for target in targets:
-            if target["hit"]:
-                continue
-
-            half_size = (target["size"] / 2) * hitbox_scale
-            y_half_size = target["size"] / 2
-            box_min = target["hitbox_position"] - pygame.math.Vector3(
-                half_size, y_half_size, half_size
-            )
-            box_max = target["hitbox_position"] + pygame.math.Vector3(
-                half_size, y_half_size, half_size
+        indices = targets.live_indices()
+        boxes_min, boxes_max = targets.hitbox_bounds(hitbox_scale, indices)
+        # move the boxes along with the interpolated capsules
+        offset = targets.render_positions(alpha, indices) - targets.position[indices]
+        debug_draw.boxes(boxes_min + offset, boxes_max + offset, (0, 1, 0))
+    render_queue.submit(
+        debug_draw.draw_layer, "world", lighting=False, primitive=GL_LINES
+    )
+
+    draw_crosshair(debug_draw, width, height)
+    render_queue.submit(
+        debug_draw.draw_layer,
+        "screen",
+        layer=SCREEN,
+        depth=False,
+        lighting=False,
+        primitive=GL_LINES,
+    )
+    if profiler is not None:
+        render_queue.submit(
+            draw_profiler_overlay,
+            profiler,
+            width,
+            height,
+            layer=SCREEN,
+            blend=True,
+            depth=False,
+            lighting=False,
+            primitive=GL_QUADS,
+        )
+
+    results = render_queue.flush(width, height)
+    return sum(result for result in results if result is not None)
+
+
+def parse_args():
+    # no abbreviations, --fast-gl is looked for by its full name before
+    # argparse runs, so "--fast" would turn it on here but not there
+    parser = argparse.ArgumentParser(
+        description="Simple 3D Shooter", allow_abbrev=False
+    )
+    parser.add_argument(
+        "--profile-csv",
+        metavar="PATH",
+        help="write per frame stage timings to a csv file",
+    )
+    parser.add_argument(
+        "--tick-rate", type=int, default=60, help="simulation ticks per second"
+    )
+    parser.add_argument(
+        "--fps", type=int, default=0, help="render frame cap, 0 renders uncapped"
+    )
+    parser.add_argument(
+        "--vsync", action="store_true", help="sync rendering to the display"
+    )
+    parser.add_argument(
+        "--record", metavar="PATH", help="record every simulation tick's input"
+    )
+    parser.add_argument("--replay", metavar="PATH", help="play back a recorded session")
+    parser.add_argument(
+        "--collision",
+        choices=COLLISION_MODES,
+        default="sweep",
+        help="per tick sweeps, or impacts solved once when a shot is fired",
+    )
+    parser.add_argument(
+        "--spawn",
+        choices=SPAWN_MODES,
+        default="none",
+        help="no new targets, timed waves, or respawn every killed target",
+    )
+    parser.add_argument(
+        "--spawn-interval",
+        type=float,
+        default=5.0,
+        help="seconds between waves, or before a killed target respawns",
+    )
+    parser.add_argument(
+        "--waves", type=int, default=0, help="waves in a session, 0 never stops"
+    )
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="print where the startup time went after the first frame and exit",
+    )
+    parser.add_argument(
+        "--fast-gl",
+        action="store_true",
+        help="turn off pyopengl error checking and forbid array copies",
+    )
+    parser.add_argument(
+        "--count-gl",
+        action="store_true",
+        help="count gl calls per frame by calling function",
+    )
+    parser.add_argument(
+        "--triangle-budget",
+        type=int,
+        default=0,
+        help="most target triangles drawn per frame, 0 for no limit",
+    )
+    parser.add_argument(
+        "--terrain",
+        default="flat",
+        metavar="flat|procedural|PATH",
+        help="flat ground, seeded hills, or a grayscale heightmap image",
+    )
+    parser.add_argument(
+        "--view-distance",
+        type=float,
+        default=300.0,
+        help="how far terrain chunks are kept around the camera",
+    )
+    return parser.parse_args()
+
+
+def open_window(vsync):
+    flags = DOUBLEBUF | OPENGL
+    if vsync:
+        try:
+            return pygame.display.set_mode(
+                (screen_width, screen_height), flags, vsync=1
             )
-            draw_hitbox(box_min, box_max)
+        except pygame.error:
+            print("vsync is not available, rendering without it")
+    return pygame.display.set_mode((screen_width, screen_height), flags)
 
-    draw_crosshair(screen.get_width(), screen.get_height())
+
+# gl side of the gun mesh, runs once the worker has parsed it
+def upload_gun(mesh_data):
+    mesh = LoadMesh("Gun.obj", GL_TRIANGLES, mesh_data=mesh_data)
+    mesh.upload()
+    return mesh
 
 
 def main():
-    initialise()
+    global screen, camera, terrain
+    args = parse_args()
+    startup = StartupTimer(startup_start)
+    startup.mark("imports")
+
+    # decode assets on worker threads while the window comes up
+    assets = AssetManager()
+    assets.request("gun", load_obj_cached, "Gun.obj")
+    assets.request("terrain", load_texture_data, "terrain_texture.jpeg")
+
+    pygame.init()
+    screen = open_window(args.vsync)
+    pygame.display.set_caption("Simple 3D Shooter")
+    startup.mark("window")
+
+    recording = None
+    if args.replay:
+        recording = load_recording(args.replay)
+        simulation = recording.create_simulation(verbose=True)
+        simulation.replay = ScriptedInput(recording.frames)
+    else:
+        simulation = Simulation(
+            hitbox_scale=hitbox_scale,
+            tick_rate=args.tick_rate,
+            collision=args.collision,
+            spawn=args.spawn,
+            spawn_interval=args.spawn_interval,
+            waves=args.waves,
+            terrain=args.terrain,
+            verbose=True,
+        )
+    if args.record:
+        simulation.recorder = InputRecorder(args.record, simulation)
+    camera = simulation.camera
+    startup.mark("simulation")
+
+    # only the gl uploads happen here, the parsing is already done or running
+    camera.attach_gun(assets.upload("gun", upload_gun))  # attach gun mesh to camera
+    terrain_texture = assets.upload("terrain", upload_texture)
+    assets.shutdown()
+    startup.mark("assets")
+
+    if args.triangle_budget > 0:
+        target_lod.triangle_budget = args.triangle_budget
+
+    # the simulation walks the player over the same height field, a replay
+    # brings its own terrain
+    if simulation.height_field is not None:
+        terrain = TerrainStreamer(
+            simulation.height_field, view_distance=args.view_distance
+        )
+        # far plane past the last chunk so distant hills are not clipped
+        camera.far = max(camera.far, args.view_distance + terrain.chunk_size * 2)
+
+    initialise(terrain_texture)
+    startup.mark("gl setup")
     clock = pygame.time.Clock()
     done = False
     pygame.event.set_grab(True)
     pygame.mouse.set_visible(False)
-    targets = create_targets()
-    bullets = []
-    fire_rate = 2.5
-    fire_interval = 1.0 / fire_rate
-    time_since_last_fire = 0.0
     show_hitboxes = False
+    show_profiler = False
 
-    while not done:
-        delta_time = clock.tick(60) / 1000.0
-        delta_time = min(delta_time, 0.05)
+    # per stage frame timings, toggled on screen with f3
+    profiler = FrameProfiler(csv_path=args.profile_csv)
+    simulation.profiler = profiler
 
-        time_since_last_fire += delta_time
+    gl_calls = None
+    if args.count_gl:
+        gl_calls = GLCallCounter()
+        gl_calls.install(
+            [sys.modules[__name__]] + [sys.modules[name] for name in GL_MODULES]
+        )
+
+    while not done:
+        # simulation runs at a fixed tick rate, rendering as fast as allowed
+        frame_time = clock.tick(args.fps) / 1000.0
+        profiler.begin_frame()
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -174,44 +377,65 @@ def main():
                     pygame.mouse.set_visible(False)
                 if event.key == K_h:
                     show_hitboxes = not show_hitboxes
-
-        # allow for holding down the mouse button to fire
-        buttons = pygame.mouse.get_pressed()
-        if buttons[0]:
-            if time_since_last_fire >= fire_interval:
-                shoot_bullet(camera, bullets)
-                time_since_last_fire = 0.0
-
-        camera.update(screen.get_width(), screen.get_height(), delta_time)
-        # apply recoil to the gun
-        camera.update_recoil(delta_time)
-
-        # target movement
-        update_targets(targets, delta_time)
-
-        # update bullet movement and check collision
-        bullets_to_remove = []
-        for bullet in bullets:
-            bullet.update(delta_time)
-            if check_hits_continuous(targets, bullet, hitbox_scale):
-                bullets_to_remove.append(bullet)
-            elif not bullet.is_alive():
-                bullets_to_remove.append(bullet)
-
-        display(targets, bullets, show_hitboxes)
-
-        # remove bullets that are no longer needed
-        for bullet in bullets_to_remove:
-            bullets.remove(bullet)
+                if event.key == K_F3:
+                    show_profiler = not show_profiler
+
+        frame = read_pygame_input(screen.get_width(), screen.get_height())
+        profiler.mark("input")
+        alpha = simulation.advance(frame_time, frame)
+        camera.interpolate(alpha)
+
+        culled = display(
+            simulation.targets,
+            simulation.bullets,
+            show_hitboxes,
+            alpha,
+            profiler if show_profiler else None,
+        )
+        profiler.count("targets", simulation.targets.live_count())
+        profiler.count("culled", culled)
+        profiler.count("state changes", render_queue.state_changes)
+        profiler.count("triangles", target_lod.triangles)
+        if terrain is not None:
+            profiler.count("chunks", terrain.drawn)
+            profiler.count("terrain triangles", terrain.triangles)
+        profiler.mark("display")
 
         pygame.display.flip()
+        profiler.mark("flip")
+        if gl_calls is not None:
+            gl_calls.end_frame()
+            profiler.count("gl calls", gl_calls.last_frame_calls)
+        profiler.end_frame()
+
+        if profiler.frames == 1:
+            startup.mark("first frame")
+            if args.startup_report:
+                print(startup.report(assets))
+                done = True
 
+        # a replay runs every recorded tick, even past the win, so verify()
+        # compares the whole session
+        if recording is not None:
+            if simulation.replay.finished():
+                done = True
         # check if all targets are killed
-        if all(target["hit"] for target in targets):
+        elif simulation.finished():
             print("All targets eliminated! You win!")
-            pygame.quit()
-            exit()
-
+            done = True
+
+    if simulation.recorder is not None:
+        simulation.recorder.close(simulation)
+    if recording is not None:
+        print(verify(recording, simulation))
+    print(profiler.summary())
+    if gl_calls is not None:
+        print(gl_calls.summary())
+    profiler.close()
+    if terrain is not None:
+        terrain.shutdown()
+    # free the gpu buffers while the context is still alive
+    release_capsule_meshes()
     pygame.quit()
 
 
@@ -0,0 +1,56 @@
+import Camera
+from Input import IDLE_INPUT
+
+
+def make_camera():
+    return Camera.Camera(-49.0, 49.0, -49.0, 49.0)
+
+
+def count_look_at(monkeypatch):
+    calls = []
+    look_at = Camera.look_at
+
+    def counted(*args):
+        calls.append(args)
+        return look_at(*args)
+
+    monkeypatch.setattr(Camera, "look_at", counted)
+    return calls
+
+
+def test_idle_frames_keep_the_view(monkeypatch):
+    camera = make_camera()
+    camera.view_matrix()
+    calls = count_look_at(monkeypatch)
+
+    for _ in range(100):
+        camera.apply_input(IDLE_INPUT, 1 / 60)
+        camera.interpolate(0.5)
+        camera.view_matrix()
+    assert len(calls) == 0
+
+
+def test_turning_and_moving_rebuild_the_view(monkeypatch):
+    camera = make_camera()
+    camera.view_matrix()
+    calls = count_look_at(monkeypatch)
+
+    camera.apply_input(IDLE_INPUT._replace(mouse_dx=5.0), 1 / 60)
+    camera.view_matrix()
+    assert len(calls) == 1
+
+    camera.apply_input(IDLE_INPUT._replace(forward=True), 1 / 60)
+    camera.view_matrix()
+    assert len(calls) == 2
+
+
+def test_pitch_held_at_its_limit_keeps_the_view(monkeypatch):
+    camera = make_camera()
+    camera.rotate(0, 200)
+    camera.view_matrix()
+    calls = count_look_at(monkeypatch)
+
+    camera.apply_input(IDLE_INPUT._replace(mouse_dy=-50.0), 1 / 60)
+    camera.view_matrix()
+    assert camera.pitch == 89.0
+    assert len(calls) == 0
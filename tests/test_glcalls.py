@@ -0,0 +1,37 @@
+import types
+import numpy as np
+import OpenGL.GL
+from OpenGL import platform
+from GLCalls import GLCallCounter
+from Transform import gl_matrix
+
+
+def fake_module():
+    module = types.ModuleType("fake_draw")
+    module.glClear = OpenGL.GL.glClear
+    module.glGenBuffers = OpenGL.GL.glGenBuffers
+    module.gl_matrix = gl_matrix
+    return module
+
+
+def test_only_pyopengl_functions_are_wrapped():
+    module = fake_module()
+    counter = GLCallCounter()
+    counter.install([module])
+
+    assert module.glClear is not OpenGL.GL.glClear
+    assert module.gl_matrix is gl_matrix
+    module.gl_matrix(np.eye(4))
+    assert sum(counter.frame.values()) == 0
+
+    counter.uninstall()
+    assert module.glClear is OpenGL.GL.glClear
+
+
+def test_null_functions_stay_falsy(monkeypatch):
+    # what pyopengl exports when the driver has no buffer objects
+    missing = platform.PLATFORM.nullFunction("glGenBuffers", platform.PLATFORM.GL)
+    monkeypatch.setattr(OpenGL.GL, "glGenBuffers", missing)
+    module = fake_module()
+    GLCallCounter().install([module])
+    assert not module.glGenBuffers